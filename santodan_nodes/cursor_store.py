@@ -0,0 +1,138 @@
+import os
+import time
+import sqlite3
+import threading
+
+_data_root = None
+
+def data_dir(*parts):
+    """
+    `<ComfyUI user dir>/santodan_nodes/<parts>`, kept outside the node folder so updates don't wipe it.
+    Processes started without ComfyUI (wildcard workers) get the folder through SANTODAN_DATA_DIR.
+    """
+    global _data_root
+    if _data_root is None:
+        _data_root = os.environ.get("SANTODAN_DATA_DIR")
+        if not _data_root:
+            import folder_paths
+            _data_root = os.path.join(folder_paths.get_user_directory(), "santodan_nodes")
+    return os.path.join(_data_root, *parts)
+
+def cursor_scope(unique_id, extra_pnginfo=None):
+    """'<workflow id>:<node id>' when the frontend sent a workflow id, otherwise just the node id."""
+    workflow_id = None
+    if isinstance(extra_pnginfo, dict) and isinstance(extra_pnginfo.get("workflow"), dict):
+        workflow_id = extra_pnginfo["workflow"].get("id")
+    node_id = "global" if unique_id is None else str(unique_id)
+    return f"{workflow_id}:{node_id}" if workflow_id else node_id
+
+class CursorStore:
+    """
+    Small persistent `(scope, key) -> int` store on SQLite.
+    Reads are served from an in-memory dict, writes go through a transaction first, so a crash
+    never leaves a half-written cursor and a restart resumes where the last run stopped.
+    """
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._pid = os.getpid()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS cursors (scope TEXT NOT NULL, key TEXT NOT NULL, value INTEGER NOT NULL, "
+            "updated REAL NOT NULL, PRIMARY KEY (scope, key))"
+        )
+
+    @classmethod
+    def open(cls, name):
+        """Shared store `<data_dir>/state/<name>.sqlite3`."""
+        path = data_dir("state", f"{name}.sqlite3")
+        with cls._stores_lock:
+            if path not in cls._stores: cls._stores[path] = cls(path)
+            return cls._stores[path]
+
+    def _conn(self):
+        # One connection per thread. The pid check only matters if a store is inherited through
+        # fork; wildcard pool workers are fresh interpreters and open their own stores.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        if self._pid != os.getpid():
+            self._cache, self._lock, self._pid = {}, threading.Lock(), os.getpid()
+        return conn
+
+    def get(self, scope, key, default=0):
+        cache_key = (scope, key)
+        if cache_key in self._cache: return self._cache[cache_key]
+        row = self._conn().execute("SELECT value FROM cursors WHERE scope = ? AND key = ?", cache_key).fetchone()
+        value = row[0] if row else default
+        self._cache[cache_key] = value
+        return value
+
+    def set(self, scope, key, value):
+        self.set_many(scope, {key: value})
+
+    def set_many(self, scope, values):
+        """Writes several cursors of one scope in a single transaction."""
+        if not values: return
+        now = time.time()
+        with self._lock:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO cursors (scope, key, value, updated) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (scope, key) DO UPDATE SET value = excluded.value, updated = excluded.updated",
+                    [(scope, key, int(value), now) for key, value in values.items()],
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            for key, value in values.items(): self._cache[(scope, key)] = int(value)
+
+    def advance(self, scope, keys, step=1):
+        """Moves every cursor in `keys` forward by `step`."""
+        self.set_many(scope, {key: self.get(scope, key) + step for key in keys})
+
+    def items(self, scope=None):
+        query = "SELECT scope, key, value, updated FROM cursors"
+        rows = self._conn().execute(query + (" WHERE scope = ?" if scope is not None else "") + " ORDER BY scope, key",
+                                    (scope,) if scope is not None else ()).fetchall()
+        return [{"scope": s, "key": k, "value": v, "updated": u} for s, k, v, u in rows]
+
+    def prune(self, max_age=None, max_scopes=None):
+        """
+        Drops stale state: every scope not updated for `max_age` seconds, then all but the
+        `max_scopes` most recently updated scopes. Returns the number of rows removed.
+        """
+        removed = 0
+        with self._lock:
+            conn = self._conn()
+            if max_age is not None:
+                cur = conn.execute("DELETE FROM cursors WHERE scope IN (SELECT scope FROM cursors GROUP BY scope HAVING MAX(updated) < ?)",
+                                   (time.time() - max_age,))
+                removed += cur.rowcount
+            if max_scopes is not None:
+                cur = conn.execute("DELETE FROM cursors WHERE scope NOT IN (SELECT scope FROM cursors GROUP BY scope ORDER BY MAX(updated) DESC LIMIT ?)",
+                                   (max_scopes,))
+                removed += cur.rowcount
+            if removed: self._cache.clear()
+        return removed
+
+    def reset(self, scope=None, key=None):
+        """Deletes one cursor, every cursor of a scope, or everything. Returns the number removed."""
+        where, params = [], []
+        if scope is not None: where.append("scope = ?"); params.append(scope)
+        if key is not None: where.append("key = ?"); params.append(key)
+        with self._lock:
+            cur = self._conn().execute("DELETE FROM cursors" + (" WHERE " + " AND ".join(where) if where else ""), params)
+            self._cache.clear()
+        return cur.rowcount
@@ -0,0 +1,104 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+GIB = 1024 ** 3
+
+class ComponentCache:
+    """
+    Cache of the components loaded by ModelAssembler (UNet, VAE, CLIP, full checkpoints).
+    Entries are keyed on the kind, the source files with their mtime and size, and the load
+    options (dtype, device, clip type), so editing or replacing a file never returns stale weights.
+    With `budget_bytes` None (the default) only the latest component of each kind is kept: a
+    component is released as soon as another one of its kind is loaded, and ComfyUI can free it.
+    With a budget it is an LRU where an entry costs the size of its files on disk, least recently
+    used entries are dropped once the total goes over it; 0 turns the cache off.
+    """
+    def __init__(self, budget_bytes=None):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()   # key -> (component, size)
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def make_key(kind, paths, options=None):
+        files = []
+        for path in paths:
+            st = os.stat(path)
+            files.append((os.path.abspath(path), st.st_mtime_ns, st.st_size))
+        opts = tuple(sorted((k, str(v)) for k, v in (options or {}).items()))
+        return (kind, tuple(files), opts), sum(f[2] for f in files)
+
+    @property
+    def used_bytes(self):
+        with self._lock:
+            return sum(size for _, size in self._entries.values())
+
+    def _evict(self):
+        used = sum(size for _, size in self._entries.values())
+        while self._entries and used > self.budget_bytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            used -= size
+
+    def get_or_load(self, kind, paths, options, loader):
+        """Returns (component, was_cached); `loader()` runs only on a miss and outside the lock."""
+        key, size = self.make_key(kind, paths, options)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], True
+            self.misses += 1
+            # The component being replaced is let go before the new one is read, not after.
+            if self.budget_bytes is None: self._drop(lambda k: k[0] == kind)
+        component = loader()
+        with self._lock:
+            if self.budget_bytes is None:
+                self._drop(lambda k: k[0] == kind)
+                self._entries[key] = (component, size)
+                return component, False
+            # Older versions of the same files/options can never be hit again.
+            self._drop(lambda k: k[0] == kind and k[2] == key[2] and [f[0] for f in k[1]] == [f[0] for f in key[1]])
+            if size <= self.budget_bytes:
+                self._entries[key] = (component, size)
+                self._evict()
+        return component, False
+
+    def _drop(self, predicate):
+        for key in [k for k in self._entries if predicate(k)]: del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def budget_from_env(name="SANTODAN_ASSEMBLER_CACHE_GB"):
+    """Cache budget in bytes from an environment variable in GiB; unset (or invalid) means one entry per kind."""
+    value = os.environ.get(name, "").strip()
+    if not value: return None
+    try: return max(0, int(float(value) * GIB))
+    except ValueError:
+        print(f"[Santodan Model Assembler] Ignoring {name}={value!r}, expected a size in GiB.")
+        return None
+
+# Shared by every ModelAssembler node, so its size is one server-wide setting rather than a node input.
+ASSEMBLER_CACHE = ComponentCache(budget_from_env())
+
+def peak_rss_bytes():
+    """Highest resident memory of this process so far, or None when the platform doesn't say."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process(os.getpid()).memory_info()
+        return getattr(info, "peak_wset", None)
+    except ImportError:
+        return None
+
+def format_bytes(size):
+    return f"{size / 1024 ** 3:.2f} GB"
@@ -0,0 +1,177 @@
+import os
+import json
+import struct
+import threading
+
+# Header sizes above this are not a real safetensors file.
+MAX_HEADER_BYTES = 100 * 1024 * 1024
+
+_headers = {}
+_headers_lock = threading.Lock()
+
+def read_safetensors_header(path):
+    """
+    {tensor name: (dtype, shape)} from the JSON header of a .safetensors file, without reading
+    any weights. Cached per file and revalidated by mtime and size.
+    """
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _headers.get(path)
+    if cached and cached[0] == stamp: return cached[1]
+    with open(path, 'rb') as f:
+        raw = f.read(8)
+        if len(raw) != 8: raise ValueError(f"{os.path.basename(path)} is too small to be a safetensors file")
+        (length,) = struct.unpack('<Q', raw)
+        if length > min(MAX_HEADER_BYTES, st.st_size - 8): raise ValueError(f"{os.path.basename(path)} has an invalid safetensors header")
+        header = json.loads(f.read(length))
+    tensors = {k: (v["dtype"], tuple(v["shape"])) for k, v in header.items() if k != "__metadata__"}
+    with _headers_lock: _headers[path] = (stamp, tensors)
+    return tensors
+
+def dtype_summary(tensors):
+    """Stored dtypes weighted by parameter count, largest first: [("BF16", 0.98), ...]."""
+    totals = {}
+    for dtype, shape in tensors.values():
+        count = 1
+        for d in shape: count *= d
+        totals[dtype] = totals.get(dtype, 0) + count
+    total = sum(totals.values()) or 1
+    return sorted(((d, n / total) for d, n in totals.items()), key=lambda x: -x[1])
+
+def format_dtypes(tensors):
+    return ", ".join(f"{d} {share:.0%}" for d, share in dtype_summary(tensors)[:3])
+
+def _find(tensors, suffix):
+    """Shape of the first tensor whose name ends with `suffix` (any prefix), or None."""
+    for key, (_, shape) in tensors.items():
+        if key.endswith(suffix): return shape
+    return None
+
+# Vocabulary sizes telling the decoder-only text encoders apart.
+LLM_VOCABS = {151936: "qwen", 152064: "qwen", 128256: "llama", 256000: "gemma", 262144: "gemma", 262208: "gemma"}
+
+def detect_text_encoders(tensors):
+    """Text encoders stored in one CLIP file (several for combined files), e.g. {"clip_l", "t5"}."""
+    found = set()
+    for key, (_, shape) in tensors.items():
+        if key.endswith("encoder.layers.0.self_attn.q_proj.weight") and "text_model" in key:
+            found.add({768: "clip_l", 1024: "clip_h", 1280: "clip_g"}.get(shape[0], "clip"))
+        elif key.endswith("model.embed_tokens.weight"):
+            found.add(LLM_VOCABS.get(shape[0], "llm"))
+    shared = _find(tensors, "shared.weight")
+    if shared is not None and _find(tensors, "encoder.block.0.layer.0.SelfAttention.q.weight") is not None:
+        found.add({256384: "umt5", 384: "byt5"}.get(shared[0], "t5"))
+    return found
+
+# The text encoders each clip_type can be given (any non-empty subset is accepted).
+CLIP_TYPE_ENCODERS = {
+    "stable_diffusion": {"clip_l", "clip_h"},
+    "sdxl": {"clip_l", "clip_g"},
+    "sd3": {"clip_l", "clip_g", "t5"},
+    "stable_cascade": {"clip_g"},
+    "flux": {"clip_l", "t5"},
+    "chroma": {"t5"},
+    "pixart": {"t5"},
+    "mochi": {"t5"},
+    "ltxv": {"t5"},
+    "cosmos": {"t5"},
+    "stable_audio": {"t5"},
+    "hunyuan_video": {"clip_l", "llama"},
+    "hidream": {"clip_l", "clip_g", "t5", "llama"},
+    "wan": {"umt5"},
+    "ace": {"umt5"},
+    "lumina2": {"gemma"},
+    "qwen_image": {"qwen"},
+    "omnigen2": {"qwen"},
+    "hunyuan_image": {"qwen", "byt5"},
+}
+KNOWN_ENCODERS = set().union(*CLIP_TYPE_ENCODERS.values())
+
+# Diffusion model signatures (a key fragment each) and the clip types they pair with, most specific first.
+UNET_SIGNATURES = [
+    # Hunyuan Image 2.1 uses the Hunyuan Video DiT plus a ByT5 glyph input.
+    ("byt5_in.", "hunyuan_image", {"hunyuan_image"}),
+    ("txt_in.individual_token_refiner", "hunyuan_video", {"hunyuan_video", "hunyuan_image"}),
+    ("distilled_guidance_layer", "chroma", {"chroma"}),
+    ("double_blocks.0.img_attn.qkv.weight", "flux", {"flux"}),
+    ("double_stream_blocks.0", "hidream", {"hidream"}),
+    ("joint_blocks.0", "sd3", {"sd3"}),
+    ("transformer_blocks.0.img_mod.1.weight", "qwen_image", {"qwen_image"}),
+    ("cap_embedder", "lumina2", {"lumina2"}),
+    ("blocks.0.cross_attn.k.weight", "wan", {"wan"}),
+    ("blocks.0.attn.qkv_x.weight", "mochi", {"mochi"}),
+    ("down_blocks.0.0.channelwise", "stable_cascade", {"stable_cascade"}),
+    ("label_emb.0.0.weight", "sdxl", {"sdxl"}),
+    ("input_blocks.1.1.transformer_blocks.0.attn2.to_k.weight", "sd1/sd2", {"stable_diffusion"}),
+]
+
+# Latent channels the VAE must produce for architectures we are sure about.
+LATENT_CHANNELS = {"sdxl": 4, "sd1/sd2": 4, "flux": 16, "chroma": 16, "sd3": 16, "hidream": 16, "lumina2": 16}
+
+def detect_unet(tensors):
+    """(architecture name, compatible clip types) or (None, None) when it isn't recognized."""
+    for fragment, arch, clip_types in UNET_SIGNATURES:
+        if any(fragment in key for key in tensors): return arch, clip_types
+    return None, None
+
+def vae_latent_channels(tensors):
+    shape = _find(tensors, "decoder.conv_in.weight")
+    return shape[1] if shape and len(shape) > 1 else None
+
+def compatible_clip_types(encoders):
+    """Clip types that accept this set of text encoders; None when some encoder isn't recognized."""
+    if not encoders or not encoders <= KNOWN_ENCODERS: return None
+    return {t for t, allowed in CLIP_TYPE_ENCODERS.items() if encoders <= allowed}
+
+def inspect_components(unet_path, vae_path, clip_paths, clip_type):
+    """
+    Reads only the safetensors headers of the selected files and checks that they fit together.
+    Returns (clip type to use, report lines). `clip_type` "auto" is resolved from the text
+    encoders and the diffusion model. Detection goes by tensor names and new models reuse old
+    layouts, so only a certain mismatch (the VAE's latent channels) raises ValueError before any
+    weights are read; text encoders or a clip_type that don't look right only add a warning line.
+    Files that aren't .safetensors are skipped.
+    """
+    def header(path):
+        return read_safetensors_header(path) if path.lower().endswith(".safetensors") else None
+
+    lines, candidates, auto_pick = [], None, None
+    unet = header(unet_path)
+    arch = None
+    if unet is not None:
+        arch, candidates = detect_unet(unet)
+        lines.append(f"unet: {arch or 'unknown architecture'}, {format_dtypes(unet)}")
+
+    clip_headers = [header(p) for p in clip_paths]
+    if all(h is not None for h in clip_headers):
+        encoders = set().union(*(detect_text_encoders(h) for h in clip_headers))
+        lines.append(f"clip: {' + '.join(sorted(encoders)) or 'unknown'}, {format_dtypes({k: v for h in clip_headers for k, v in h.items()})}")
+        by_encoders = compatible_clip_types(encoders)
+        if by_encoders is not None:
+            if candidates is not None and not candidates & by_encoders:
+                lines.append(f"warning: the text encoders ({' + '.join(sorted(encoders))}) don't look like the ones for a {arch} diffusion model")
+                # The clip_type has to load these encoders, so they decide.
+                candidates = by_encoders
+            candidates = by_encoders if candidates is None else candidates & by_encoders
+            # Several types can take the same encoders ("auto" only), one whose set is exactly these encoders wins.
+            exact = {t for t in candidates if CLIP_TYPE_ENCODERS[t] == encoders}
+            if len(exact) == 1: auto_pick = exact
+
+    vae = header(vae_path)
+    if vae is not None:
+        channels = vae_latent_channels(vae)
+        lines.append(f"vae: {channels if channels is not None else '?'} latent channels, {format_dtypes(vae)}")
+        expected = LATENT_CHANNELS.get(arch)
+        if expected and channels and channels != expected:
+            raise ValueError(f"The VAE has {channels} latent channels but the {arch} diffusion model needs {expected}.")
+
+    if clip_type == "auto":
+        if candidates and len(candidates) > 1 and auto_pick: candidates = auto_pick
+        if not candidates or len(candidates) != 1:
+            options = ", ".join(sorted(candidates)) if candidates else "no match"
+            raise ValueError(f"Could not pick the clip_type automatically ({options}), please select it.")
+        clip_type = next(iter(candidates))
+        lines.append(f"clip_type: {clip_type} (auto)")
+    elif candidates and clip_type not in candidates:
+        lines.append(f"warning: clip_type '{clip_type}' doesn't look right for these files, expected one of: {', '.join(sorted(candidates))}")
+    return clip_type, lines
@@ -0,0 +1,136 @@
+import os
+import csv
+import json
+import threading
+import folder_paths
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from collections.abc import Sequence
+
+PROMPT_FILE_EXTENSIONS = ('.txt', '.jsonl', '.csv')
+# Fields tried, in order, when a JSONL line is an object.
+JSONL_FIELDS = ("prompt", "text")
+
+def resolve_prompt_file(path):
+    """Paths are taken from ComfyUI's input folder; one outside it (absolute, `..`) raises ValueError."""
+    root = os.path.abspath(folder_paths.get_input_directory())
+    full_path = os.path.abspath(os.path.join(root, path.strip()))
+    try: inside = os.path.commonpath([root, full_path]) == root
+    except ValueError: inside = False
+    if not inside: raise ValueError(f"Prompt list file must be inside ComfyUI's input folder: {path}")
+    return full_path
+
+class FilePromptList(Sequence):
+    """
+    Read-only prompt list backed by a .txt (one prompt per line), .jsonl (a string or an object
+    with a "prompt"/"text" field per line) or .csv file ("prompt" column, or the first column; a
+    header row without a "prompt" column is skipped when csv.Sniffer recognises it).
+    Only the byte range of each entry is kept in memory (16 bytes per prompt), an entry is read
+    and decoded when it is accessed, so a 100k prompt file costs the same as a short one.
+    The index is built once per file version (mtime and size) and shared between nodes.
+    """
+    _indexes = {}
+    _lock = threading.Lock()
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.format = os.path.splitext(self.path)[1].lower()
+        if self.format not in PROMPT_FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported prompt list file (use {', '.join(PROMPT_FILE_EXTENSIONS)}): {path}")
+        self._offsets, self._column = self._get_index()
+
+    def _get_index(self):
+        st = os.stat(self.path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._indexes.get(self.path)
+        if cached and cached[0] == stamp: return cached[1:]
+        with self._lock:
+            cached = self._indexes.get(self.path)
+            if cached and cached[0] == stamp: return cached[1:]
+            offsets, column = self._build_index()
+            self._indexes[self.path] = (stamp, offsets, column)
+            return offsets, column
+
+    def _build_index(self):
+        offsets, column = array('Q'), 0
+        pos, start, open_quotes = 0, None, False
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                if start is None: start = pos
+                pos += len(raw)
+                # A CSV record continues over newlines inside a quoted field.
+                if self.format == '.csv' and raw.count(b'"') % 2: open_quotes = not open_quotes
+                if open_quotes: continue
+                if raw.strip(): offsets.extend((start, pos))
+                start = None
+        if self.format == '.csv' and offsets:
+            header = [c.strip().lower() for c in self._parse_csv(self._read_raw(offsets[0], offsets[1]))]
+            if "prompt" in header:
+                column = header.index("prompt")
+                del offsets[:2]
+            elif len(offsets) > 2 and self._sniff_header(offsets):
+                del offsets[:2]
+        return offsets, column
+
+    def _sniff_header(self, offsets):
+        """Whether the first CSV record looks like a header without a "prompt" column (e.g. `caption,seed`)."""
+        sample = "".join(self._read_raw(offsets[i], offsets[i + 1]) for i in range(0, min(len(offsets), 40), 2))
+        try: return csv.Sniffer().has_header(sample)
+        except csv.Error: return False
+
+    def _read_raw(self, start, end):
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start).decode('utf-8-sig' if start == 0 else 'utf-8', errors='replace')
+
+    @staticmethod
+    def _parse_csv(text):
+        return next(csv.reader([text.rstrip('\r\n')]), [])
+
+    def _decode(self, text):
+        if self.format == '.jsonl':
+            value = json.loads(text)
+            if isinstance(value, dict):
+                value = next((value[k] for k in JSONL_FIELDS if k in value), next(iter(value.values()), ""))
+            return value if isinstance(value, str) else json.dumps(value)
+        if self.format == '.csv':
+            row = self._parse_csv(text)
+            return row[self._column] if self._column < len(row) else ""
+        return text.strip()
+
+    def __len__(self):
+        return len(self._offsets) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self): raise IndexError(index)
+        return self._decode(self._read_raw(self._offsets[2 * index], self._offsets[2 * index + 1]))
+
+    def __iter__(self):
+        # Sequential read through one handle, for "all_run" style consumers.
+        with open(self.path, 'rb') as f:
+            for i in range(len(self)):
+                start, end = self._offsets[2 * i], self._offsets[2 * i + 1]
+                f.seek(start)
+                yield self._decode(f.read(end - start).decode('utf-8-sig' if start == 0 else 'utf-8', errors='replace'))
+
+class ChainedPromptList(Sequence):
+    """Several prompt lists (plain lists or FilePromptList) seen as one, without copying them."""
+    def __init__(self, parts):
+        self.parts = [p for p in parts if len(p)]
+        self.offsets = list(accumulate(len(p) for p in self.parts))
+
+    def __len__(self):
+        return self.offsets[-1] if self.offsets else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self): raise IndexError(index)
+        part = bisect_right(self.offsets, index)
+        return self.parts[part][index - (self.offsets[part - 1] if part else 0)]
+
+    def __iter__(self):
+        for part in self.parts: yield from part
@@ -1,10 +1,17 @@
 import os
+import stat
+import uuid
+import asyncio
 import server
 from aiohttp import web
+from email.utils import formatdate, parsedate_to_datetime
 #from werkzeug.utils import secure_filename
 #
 import json
 from . import utils 
+from .wildcard_store import WildcardCatalog, TextWildcardIndex, LineWindowIndex
+from .wildcard_search import WildcardSearchIndex
+from .wildcard_stats import STATS
 
 def get_safe_wildcard_path(root, user_filename):
     user_filename = user_filename.replace('\\', '/').lstrip('/')
@@ -24,23 +31,74 @@ def get_safe_wildcard_path(root, user_filename):
     if os.path.commonpath([abs_root, full_path]) != abs_root: return None
     return full_path
 
+def read_text(path):
+    with open(path, 'r', encoding='utf-8') as f: return f.read()
+
+def atomic_write_text(path, content):
+    """
+    Writes to a temp file in the same folder and renames it over `path`, readers never see a partial file.
+    An existing file keeps its permissions, a new one gets the usual default ( 0666 minus the umask ).
+    """
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    tmp_path = os.path.join(folder, f".tmp-{uuid.uuid4().hex}{os.path.basename(path)}")
+    # Not mkstemp: it always creates the file as 0600.
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        try: os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError: pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+        raise
+
+def file_cache_headers(st):
+    """ETag / Last-Modified for a file; no-cache makes the browser revalidate with them every time."""
+    return {
+        "ETag": f'"{st.st_mtime_ns:x}-{st.st_size:x}"',
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+
+def is_not_modified(request, st, etag):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match: return etag in [t.strip() for t in if_none_match.split(',')] or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since:
+        try: return int(st.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError): return False
+    return False
+
+# Part of the wildcard listing ETag: the catalog version restarts at 0 with every server start.
+CATALOG_ETAG_TOKEN = uuid.uuid4().hex[:12]
+
 def initialize_routes(wildcards_path):
     #print("[Santodan Nodes] Initializing wildcard API routes...")
+    # Build the shared wildcard catalog once at startup, it keeps itself up to date afterwards.
+    WildcardCatalog.for_root(wildcards_path)
 
     @server.PromptServer.instance.routes.get("/santodan/wildcards")
     async def get_wildcards_endpoint(request):
         if not os.path.exists(wildcards_path): return web.json_response([])
-        filenames = []
-        for root, _, files in os.walk(wildcards_path):
-            for file in files:
-                if file.lower().endswith(('.txt', '.yaml', '.yml')):
-                    rel = os.path.relpath(os.path.join(root, file), wildcards_path)
-                    name = rel.replace('\\', '/')
-                    # Hide .txt extension from the list
-                    if name.lower().endswith('.txt'):
-                        name = name[:-4]
-                    filenames.append(name)
-        return web.json_response(sorted(filenames))
+        catalog = WildcardCatalog.for_root(wildcards_path)
+        etag = f'"catalog-{CATALOG_ETAG_TOKEN}-{catalog.version}"'
+        if etag in request.headers.get("If-None-Match", ""): return web.Response(status=304, headers={"ETag": etag})
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        query = request.query
+        if not any(k in query for k in ("q", "offset", "limit")):
+            return web.json_response(catalog.names(), headers=headers)
+        # Search / paginated listing: ?q=<text>&match=prefix|substring&offset=<n>&limit=<n>
+        try:
+            offset = int(query.get("offset", 0))
+            limit = int(query["limit"]) if "limit" in query else None
+        except ValueError:
+            return web.Response(text="offset and limit must be integers", status=400)
+        total, items = catalog.search(query.get("q", ""), query.get("match", "substring"), offset, limit)
+        return web.json_response({"total": total, "offset": offset, "limit": limit, "items": items}, headers=headers)
 
     @server.PromptServer.instance.routes.get("/santodan/wildcard-content")
     async def get_wildcard_content(request):
@@ -53,14 +111,24 @@ def initialize_routes(wildcards_path):
             return web.Response(text="Invalid filename or directory traversal attempt.", status=403)
 
         try:
-            print(f"[Santodan Wildcard Manager] Attempting to read file: {file_path}")
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            print(f"[Santodan Wildcard Manager] Success! Sending content for '{filename}'.")
-            return web.json_response({"content": content})
+            st = await asyncio.to_thread(os.stat, file_path)
         except FileNotFoundError:
-            print(f"[Santodan Wildcard Manager] File not found. Sending empty content for new file '{filename}'.")
-            return web.json_response({"content": ""})
+            # New file: the editor starts empty.
+            return web.json_response({"content": ""}, headers={"Cache-Control": "no-store"})
+        headers = file_cache_headers(st)
+        if is_not_modified(request, st, headers["ETag"]): return web.Response(status=304, headers=headers)
+        try:
+            if "start_line" in request.query or "line_count" in request.query:
+                # Line window: ?start_line=<0-based>&line_count=<n>, served from the line offset index.
+                try:
+                    start = int(request.query.get("start_line", 0))
+                    count = int(request.query["line_count"]) if "line_count" in request.query else None
+                except ValueError:
+                    return web.Response(text="start_line and line_count must be integers", status=400)
+                content, total = await asyncio.to_thread(LineWindowIndex.read_window, file_path, start, count)
+                return web.json_response({"content": content, "start_line": start, "total_lines": total}, headers=headers)
+            content = await asyncio.to_thread(read_text, file_path)
+            return web.json_response({"content": content}, headers=headers)
         except Exception as e:
             print(f"[Santodan Wildcard Manager] ERROR reading file {filename}: {e}")
             return web.json_response({"error": f"Failed to read file: {e}"}, status=500)
@@ -77,10 +145,16 @@ def initialize_routes(wildcards_path):
         if not file_path:
             return web.Response(text="Invalid filename or directory traversal attempt.", status=403)
 
+        def save():
+            # Release any memory map of the old content before it is replaced.
+            TextWildcardIndex.invalidate(file_path)
+            LineWindowIndex.invalidate(file_path)
+            atomic_write_text(file_path, content)
+            WildcardCatalog.for_root(wildcards_path).update_file(file_path)
+            WildcardSearchIndex.for_root(wildcards_path).update_file(file_path)
+
         try:
-            # Create subdirectories if they don't exist
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, 'w', encoding='utf-8') as f: f.write(content)
+            await asyncio.to_thread(save)
             return web.json_response({"status": "success", "message": f"Saved {filename}"})
         except Exception as e:
             return web.Response(text=f"Error saving file: {str(e)}", status=500)
@@ -95,15 +169,56 @@ def initialize_routes(wildcards_path):
         if not file_path:
             return web.Response(text="Invalid filename or directory traversal attempt.", status=403)
 
+        def delete():
+            if not os.path.exists(file_path): return False
+            TextWildcardIndex.invalidate(file_path)
+            LineWindowIndex.invalidate(file_path)
+            os.remove(file_path)
+            WildcardCatalog.for_root(wildcards_path).update_file(file_path)
+            WildcardSearchIndex.for_root(wildcards_path).update_file(file_path)
+            return True
+
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            if await asyncio.to_thread(delete):
                 return web.json_response({"status": "success", "message": f"Deleted {filename}"})
             else:
                 return web.Response(text=f"File not found: {filename}", status=404)
         except Exception as e:
             return web.Response(text=f"Error deleting file: {str(e)}", status=500)
 
+    @server.PromptServer.instance.routes.get("/santodan/wildcard-search")
+    async def search_wildcard_lines(request):
+        query = request.query.get('q', '')
+        try: limit = int(request.query.get('limit', 100))
+        except ValueError: limit = 100
+        total, results = await asyncio.to_thread(WildcardSearchIndex.for_root(wildcards_path).search, query, limit)
+        return web.json_response({"total": total, "results": results})
+
+    @server.PromptServer.instance.routes.get("/santodan/wildcard-cursors")
+    async def get_wildcard_cursors(request):
+        from .wildcard import WildcardManager
+        scope = request.query.get('scope')
+        return web.json_response(WildcardManager.get_cursor_store().items(scope))
+
+    @server.PromptServer.instance.routes.post("/santodan/wildcard-cursors/reset")
+    async def reset_wildcard_cursors(request):
+        from .wildcard import WildcardManager
+        try: data = await request.json()
+        except Exception: data = {}
+        removed = WildcardManager.get_cursor_store().reset(data.get('scope'), data.get('key'))
+        return web.json_response({"status": "success", "removed": removed})
+
+    @server.PromptServer.instance.routes.get("/santodan/wildcard-stats")
+    async def get_wildcard_stats(request):
+        try: top = int(request.query.get('top', 50))
+        except ValueError: top = 50
+        return web.json_response(STATS.snapshot(top))
+
+    @server.PromptServer.instance.routes.post("/santodan/wildcard-stats/reset")
+    async def reset_wildcard_stats(request):
+        STATS.reset()
+        return web.json_response({"status": "success"})
+
 def initialize_prompt_list_routes():
     #print("✅ [Santodan Nodes] Initializing PromptListTemplate routes...")
 
@@ -124,8 +239,10 @@ def initialize_prompt_list_routes():
             if not filename or not prompts: return web.Response(status=400, text="...")
             if not filename.endswith(".json"): filename += ".json"
             file_path = os.path.join(get_template_dir(), filename)
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, 'w', encoding='utf-8') as f: json.dump(prompts, f, indent=4)
+            def save():
+                atomic_write_text(file_path, json.dumps(prompts, indent=4))
+                PromptListWithTemplates.invalidate_templates(file_path)
+            await asyncio.to_thread(save)
             return web.json_response({"status": "success", "message": f"Saved to {filename}"})
         except Exception as e: return web.Response(status=500, text=str(e))
 
@@ -136,8 +253,12 @@ def initialize_prompt_list_routes():
             filename = data.get("filename")
             if not filename or filename == "None": return web.Response(status=400, text="...")
             file_path = os.path.join(get_template_dir(), filename)
-            if os.path.exists(file_path):
+            def delete():
+                if not os.path.exists(file_path): return False
                 os.remove(file_path)
+                PromptListWithTemplates.invalidate_templates(file_path)
+                return True
+            if await asyncio.to_thread(delete):
                 return web.json_response({"status": "success", "message": f"Deleted {filename}"})
             else: return web.Response(status=404, text="Template not found.")
         except Exception as e: return web.Response(status=500, text=str(e))
@@ -147,12 +268,24 @@ def initialize_prompt_list_routes():
         filename = request.query.get("filename")
         if not filename or filename == "None": return web.Response(status=400, text="...")
         file_path = os.path.join(get_template_dir(), filename)
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f: data = json.load(f)
+        try:
+            data = await asyncio.to_thread(PromptListWithTemplates.load_template, file_path)
+        except FileNotFoundError:
+            return web.Response(status=404, text="Template not found.")
+        except Exception as e: return web.Response(status=500, text=str(e))
+        if "offset" not in request.query and "limit" not in request.query:
             return web.json_response(data)
-        else: return web.Response(status=404, text="Template not found.")
+        # Slice of a large template: ?offset=<n>&limit=<n>
+        try:
+            offset = max(0, int(request.query.get("offset", 0)))
+            limit = int(request.query["limit"]) if "limit" in request.query else None
+        except ValueError:
+            return web.Response(status=400, text="offset and limit must be integers")
+        items = data if isinstance(data, list) else [data]
+        return web.json_response({"total": len(items), "offset": offset, "limit": limit,
+                                  "items": items[offset:None if limit is None else offset + limit]})
 
     @server.PromptServer.instance.routes.get("/santodan/get_prompt_lists")
     async def get_prompt_list_templates(request):
-        files = PromptListWithTemplates.get_template_files()
-        return web.json_response(["None"] + files)
\ No newline at end of file
+        files = await asyncio.to_thread(PromptListWithTemplates.get_template_files)
+        return web.json_response(["None"] + files)
@@ -0,0 +1,120 @@
+"""
+Cursor shared by several ComfyUI workers through a file lock, used by ListSelector's "leased" mode.
+
+Check that concurrent workers never get the same index ( local processes ):
+    python -m santodan_nodes.shared_cursor --workers 8 --total 10000 --chunk 16
+"""
+import os
+import re
+import time
+import argparse
+import tempfile
+from contextlib import contextmanager
+from multiprocessing import Pool
+from .cursor_store import data_dir
+
+LEASE_NAME_PATTERN = re.compile(r"[\w\-][\w.\-]*")
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock on `path` (created if needed), held across processes until the block exits."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            while True:
+                # LK_LOCK gives up after ~10s of retries; keep waiting like flock does.
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError: pass
+            try: yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try: yield
+            finally: fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def resolve_lease_path(name):
+    """
+    Cursor file of a lease name in `<data_dir>/state/leases`, or SANTODAN_LEASE_DIR (set it to a shared
+    drive to split lists between machines); paths (separators, `..`, drive letters) raise ValueError.
+    """
+    name = name.strip()
+    if not LEASE_NAME_PATTERN.fullmatch(name):
+        raise ValueError(f"lease_file must be a plain name (letters, digits, '_', '-', '.'), got '{name}'. "
+                         "Set SANTODAN_LEASE_DIR to use a shared folder.")
+    lease_dir = os.environ.get("SANTODAN_LEASE_DIR") or data_dir("state", "leases")
+    return os.path.join(lease_dir, f"{name}.cursor")
+
+class SharedCursor:
+    """
+    Next free index of a list, stored as text in `path` and only changed under `<path>.lock`.
+    Workers lease a chunk at a time, so the lock is taken once per chunk, not once per item.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f: return int(f.read().strip() or 0)
+        except (OSError, ValueError): return 0
+
+    def _write(self, value):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f: f.write(f"{value}\n")
+        os.replace(tmp_path, self.path)
+
+    def lease(self, count, total, wrap=False):
+        """
+        Reserves up to `count` indices, returns (start, end) or None once all `total` are taken.
+        With `wrap` a finished list starts over from 0 instead.
+        """
+        with file_lock(self.lock_path):
+            start = self._read()
+            if start >= total:
+                if not wrap: return None
+                start = 0
+            end = min(total, start + max(1, count))
+            self._write(end)
+            return start, end
+
+    def peek(self):
+        with file_lock(self.lock_path): return self._read()
+
+    def reset(self, value=0):
+        with file_lock(self.lock_path): self._write(value)
+
+def _drain(args):
+    """Test worker: leases until the list is done, returns the indices it got."""
+    path, total, chunk = args
+    cursor, taken = SharedCursor(path), []
+    while True:
+        lease = cursor.lease(chunk, total)
+        if lease is None: return taken
+        taken.extend(range(*lease))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check SharedCursor with concurrent local processes")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--total", type=int, default=10000)
+    parser.add_argument("--chunk", type=int, default=16)
+    args = parser.parse_args(argv)
+    path = os.path.join(tempfile.mkdtemp(prefix="santodan_lease_"), "test.cursor")
+    start = time.perf_counter()
+    with Pool(args.workers) as pool:
+        results = pool.map(_drain, [(path, args.total, args.chunk)] * args.workers)
+    elapsed = time.perf_counter() - start
+    taken = [i for r in results for i in r]
+    ok = sorted(taken) == list(range(args.total))
+    print(f"{args.workers} workers, {args.total} items in chunks of {args.chunk}: {elapsed:.2f}s, "
+          f"per worker {[len(r) for r in results]}, every index exactly once: {ok}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
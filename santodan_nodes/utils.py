@@ -6,9 +6,32 @@ from nodes import interrupt_processing
 from datetime import datetime
 import os
 import json
+import hashlib
+import threading
 import folder_paths
 import comfy.sd
 import comfy.utils
+from concurrent.futures import ThreadPoolExecutor
+from .cursor_store import CursorStore, cursor_scope
+from .shared_cursor import SharedCursor, resolve_lease_path
+from .prompt_list_source import FilePromptList, ChainedPromptList, resolve_prompt_file
+from .wildcard import WildcardManager
+from .model_cache import ASSEMBLER_CACHE, peak_rss_bytes, format_bytes
+from .model_inspect import inspect_components
+
+def current_prompt_id():
+    """Id of the prompt ComfyUI is executing, or None on versions that don't expose it."""
+    try:
+        from comfy_execution.utils import get_executing_context
+        context = get_executing_context()
+        if context is not None: return context.prompt_id
+    except ImportError:
+        pass
+    try:
+        import server
+        return getattr(server.PromptServer.instance, "last_prompt_id", None)
+    except Exception:
+        return None
 
 class AnyType(str):
     def __ne__(self, __value: object) -> bool:
@@ -17,7 +40,8 @@ any_typ = AnyType("*")
 
 class SplitBatchWithPrefix:
     """
-    Takes a batch of images and outputs one image and one string per iteration.
+    Takes a batch of images and outputs one image and one string per iteration,
+    or, in "whole batch" mode, every image of the batch at once as a list.
     Each image is assigned an incremental prefix-based name.
     Compatible with Save Image.
     """
@@ -30,24 +54,47 @@ class SplitBatchWithPrefix:
                 "subfolder": ("STRING", {"default": ""}),
                 "filename": ("STRING", {"default": "_SDXL_"}),
                 "index": ("INT", {"default": 0, "min": 0, "max": 9999}),
-            }
+            },
+            "optional": {
+                "split_mode": (["one per execution", "whole batch"], {"default": "one per execution",
+                               "tooltip": "whole batch: outputs every image of the batch with its name in a single execution."}),
+                "reset_counter": ("BOOLEAN", {"default": False, "label_on": "RESET ON NEXT RUN", "label_off": "NORMAL RUN"}),
+            },
+            "hidden": { "unique_id": "UNIQUE_ID", "extra_pnginfo": "EXTRA_PNGINFO" }
         }
 
     RETURN_TYPES = ("IMAGE", "STRING")
     RETURN_NAMES = ("image", "name")
+    # Lists so "whole batch" can return every image; "one per execution" returns one-item lists.
+    OUTPUT_IS_LIST = (True, True)
     FUNCTION = "pair_one"
     CATEGORY = "Santodan/utils"
 
     def __init__(self):
         self.current_global_index = 0
-        self.last_input_index = None
-        self.last_filename = None
-        self.last_subfolder = None
-        self.last_call_time = 0.0
-        # time window (seconds) to consider sequential calls part of the same run
-        self._same_run_window = 1.0
-
-    def pair_one(self, images, filename, index, subfolder):
+
+    @staticmethod
+    def _make_name(subfolder, number, filename):
+        return f"{subfolder}/{number}{filename}" if subfolder else f"{number}{filename}"
+
+    @staticmethod
+    def get_state_store():
+        return CursorStore.open("split_batch")
+
+    @staticmethod
+    def _hash63(data):
+        """63-bit int digest, so it fits an SQLite INTEGER."""
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little') >> 1
+
+    @classmethod
+    def _run_key(cls, images, filename, index, subfolder):
+        """
+        Identifies a run by the naming settings and the shape of the input batch; new settings
+        or another batch size always start over.
+        """
+        return cls._hash63(f"{filename}|{index}|{subfolder}|{tuple(images.shape)}".encode('utf-8'))
+
+    def pair_one(self, images, filename, index, subfolder, split_mode="one per execution", reset_counter=False, unique_id=None, extra_pnginfo=None):
         if not isinstance(images, torch.Tensor):
             raise ValueError("Expected 'images' to be a torch.Tensor")
 
@@ -59,26 +106,37 @@ class SplitBatchWithPrefix:
             today = datetime.now()
             subfolder = subfolder.replace('%date:yyyy-MM-dd%', today.strftime('%Y-%m-%d'))
 
-        # detect new run:
-        now = time.time()
-        if (self.last_input_index != index or 
-            self.last_filename != filename or 
-            self.last_subfolder != subfolder):
-            # new run parameters -> reset
-            self.current_global_index = 0
-        else:
-            # if the previous call was long ago, treat as a new run
-            if (now - self.last_call_time) > self._same_run_window:
-                self.current_global_index = 0
-
-        # update run tracking
-        self.last_input_index = index
-        self.last_filename = filename
-        self.last_subfolder = subfolder
-        self.last_call_time = now
-
+        store, scope = self.get_state_store(), cursor_scope(unique_id, extra_pnginfo)
+        run_key = self._run_key(images, filename, index, subfolder)
+        prompt_id = current_prompt_id()
+        prompt_key = self._hash63(str(prompt_id).encode('utf-8')) if prompt_id is not None else None
+        # A repeat call within the same prompt (e.g. a list of batches) always continues the run.
+        # A new queued prompt continues a "one per execution" run only while it is part way
+        # through the batch with the same settings; "whole batch" numbers every prompt from `index`.
+        same_prompt = prompt_key is not None and store.get(scope, "prompt") == prompt_key
+        counter = store.get(scope, "counter")
+        if not same_prompt and (reset_counter or split_mode == "whole batch" or store.get(scope, "run") != run_key
+                                or counter % images.shape[0] == 0):
+            counter = 0
+        self.current_global_index = counter
+
+        images_out, names_out = self._split(images, filename, index, subfolder, split_mode)
+        state = {"run": run_key, "counter": self.current_global_index}
+        if prompt_key is not None: state["prompt"] = prompt_key
+        store.set_many(scope, state)
+        return (images_out, names_out)
+
+    def _split(self, images, filename, index, subfolder, split_mode):
         # Calculate the batch size
         batch_size = images.shape[0]
+        subfolder = subfolder.strip().rstrip('/')  # Remove trailing slashes
+
+        if split_mode == "whole batch":
+            # Slices are views on the input tensor, nothing is copied.
+            start = self.current_global_index + index
+            self.current_global_index += batch_size
+            return ([images[i:i + 1] for i in range(batch_size)],
+                    [self._make_name(subfolder, start + i, filename) for i in range(batch_size)])
 
         # Use modulo to wrap around the index instead of resetting
         current_image_index = self.current_global_index % batch_size
@@ -87,35 +145,51 @@ class SplitBatchWithPrefix:
         img = images[current_image_index].unsqueeze(0)
         
         # Create path with subfolder
-        subfolder = subfolder.strip().rstrip('/')  # Remove trailing slashes
-        if subfolder:
-            name = f"{subfolder}/{self.current_global_index + index}{filename}"
-        else:
-            name = f"{self.current_global_index + index}{filename}"
+        name = self._make_name(subfolder, self.current_global_index + index, filename)
 
         self.current_global_index += 1
 
-        return (img, name)
+        return ([img], [name])
 
 class ListSelector:
-    # This class-level dictionary correctly maintains the state for each node instance.
-    current_indices = {}
+    # Positions are kept per workflow and node in ComfyUI/user/santodan_nodes/state/list_selector.sqlite3,
+    # so an increment sweep continues where it stopped after a restart.
+    # Nodes not run for STATE_RETENTION_DAYS are forgotten, and at most STATE_MAX_NODES are kept.
+    STATE_RETENTION_DAYS = 30
+    STATE_MAX_NODES = 10000
+    _pruned = False
 
     def __init__(self):
         pass
 
+    @classmethod
+    def get_state_store(cls):
+        store = CursorStore.open("list_selector")
+        if not cls._pruned:
+            cls._pruned = True
+            store.prune(max_age=cls.STATE_RETENTION_DAYS * 86400, max_scopes=cls.STATE_MAX_NODES)
+        return store
+
     @classmethod
     def INPUT_TYPES(cls):
         return {
             "required": {
                 "prompt_list": ("LIST",),
-                "mode": (["all_run", "selected", "increment"],),
+                "mode": (["all_run", "selected", "increment", "sharded", "leased"],),
                 "index": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),
                 "stop_at_end": ("BOOLEAN", {"default": False, "label_on": "HALT QUEUE AT END", "label_off": "LOOP AT END"}),
                 # --- MODIFIED WIDGET ---
                 # This is now a boolean toggle switch. It's more intuitive for a one-shot action.
                 "reset_counter": ("BOOLEAN", {"default": False, "label_on": "RESET ON NEXT RUN", "label_off": "NORMAL RUN"})
             },
+            "optional": {
+                # sharded: worker `shard_index` of `shard_count` takes every shard_count-th prompt.
+                "shard_index": ("INT", {"default": 0, "min": 0, "max": 1023}),
+                "shard_count": ("INT", {"default": 1, "min": 1, "max": 1024}),
+                # leased: workers take chunks from a cursor file shared through a file lock.
+                "lease_file": ("STRING", {"default": "list_selector", "tooltip": "Name of the shared cursor (in ComfyUI/user/santodan_nodes/state/leases, or the SANTODAN_LEASE_DIR folder). Workers using the same one split the list."}),
+                "lease_chunk": ("INT", {"default": 16, "min": 1, "max": 100000, "tooltip": "How many prompts a worker reserves at once."}),
+            },
             "hidden": {"prompt": "PROMPT", "extra_pnginfo": "EXTRA_PNGINFO", "unique_id": "UNIQUE_ID"},
         }
 
@@ -129,20 +203,41 @@ class ListSelector:
     def IS_CHANGED(cls, **kwargs):
         return float("NaN") # Always run this node to check for state changes.
 
-    def run(self, prompt_list, mode, index, stop_at_end, reset_counter, unique_id, prompt, extra_pnginfo):
+    def _end_of_list(self, node_id, stop_at_end):
+        """True when the queue should halt, otherwise the caller loops back to the start."""
+        if stop_at_end:
+            print(f"🛑 [ListSelector ID: {node_id}] Queue is halted. Reset to start again.")
+            interrupt_processing()
+            return True
+        print(f"💡 [ListSelector ID: {node_id}] Reached end of list. Looping back to start.")
+        return False
+
+    def _leased_index(self, store, scope, cursor, list_size, lease_chunk, node_id, stop_at_end):
+        """Next index of this worker's lease, leasing a new chunk when it is used up; None to halt."""
+        pos, end = store.get(scope, "lease_pos"), store.get(scope, "lease_end")
+        if pos >= end or end > list_size:
+            lease = cursor.lease(lease_chunk, list_size)
+            if lease is None:
+                if self._end_of_list(node_id, stop_at_end): return None
+                lease = cursor.lease(lease_chunk, list_size, wrap=True)
+            pos, end = lease
+        store.set_many(scope, {"lease_pos": pos + 1, "lease_end": end})
+        return pos
+
+    def run(self, prompt_list, mode, index, stop_at_end, reset_counter, unique_id, prompt, extra_pnginfo,
+            shard_index=0, shard_count=1, lease_file="list_selector", lease_chunk=16):
         node_id = unique_id
-        
-        if node_id not in self.current_indices:
-            self.current_indices[node_id] = 0
+        store, scope = self.get_state_store(), cursor_scope(unique_id, extra_pnginfo)
 
         # --- UPDATED RESET LOGIC ---
         # The Python code only needs to check if the toggle is True.
         # The JavaScript will be responsible for turning it back to False.
         if reset_counter:
             print(f"💡 [ListSelector ID: {node_id}] Counter has been reset to 0 by the reset toggle.")
-            self.current_indices[node_id] = 0
+            store.set_many(scope, {"index": 0, "lease_pos": 0, "lease_end": 0})
+            if mode == "leased": SharedCursor(resolve_lease_path(lease_file)).reset()
         
-        current_index = self.current_indices[node_id]
+        current_index = store.get(scope, "index")
 
         # The rest of the function logic remains the same...
         if not prompt_list:
@@ -151,10 +246,10 @@ class ListSelector:
         list_size = len(prompt_list)
 
         if mode == "all_run":
-            return (prompt_list, list_size)
+            return (list(prompt_list), list_size)
         
         elif mode == "selected":
-            self.current_indices[node_id] = index
+            store.set(scope, "index", min(index, 2**63 - 1))  # SQLite integers are signed 64-bit
             if 0 <= index < list_size:
                 return ([prompt_list[index]], index)
             else:
@@ -162,20 +257,32 @@ class ListSelector:
 
         elif mode == "increment":
             if current_index >= list_size:
-                if stop_at_end:
-                    print(f"🛑 [ListSelector ID: {node_id}] Queue is halted. Reset to start again.")
-                    interrupt_processing()
-                    return ([""], current_index)
-                else:
-                    print(f"💡 [ListSelector ID: {node_id}] Reached end of list. Looping back to start.")
-                    current_index = 0
+                if self._end_of_list(node_id, stop_at_end): return ([""], current_index)
+                current_index = 0
             
             idx_to_use = current_index
             prompt_to_return = [prompt_list[idx_to_use]]
             
-            self.current_indices[node_id] = current_index + 1
+            store.set(scope, "index", current_index + 1)
             
             return (prompt_to_return, idx_to_use)
+
+        elif mode == "sharded":
+            # `index` here counts this worker's own steps, the prompt is shard_index + step * shard_count.
+            shard_index = shard_index % shard_count
+            idx_to_use = shard_index + current_index * shard_count
+            if idx_to_use >= list_size:
+                if self._end_of_list(node_id, stop_at_end): return ([""], idx_to_use)
+                current_index, idx_to_use = 0, shard_index
+                if idx_to_use >= list_size: return ([""], idx_to_use)
+            store.set(scope, "index", current_index + 1)
+            return ([prompt_list[idx_to_use]], idx_to_use)
+
+        elif mode == "leased":
+            cursor = SharedCursor(resolve_lease_path(lease_file))
+            idx_to_use = self._leased_index(store, scope, cursor, list_size, lease_chunk, node_id, stop_at_end)
+            if idx_to_use is None: return ([""], list_size)
+            return ([prompt_list[idx_to_use]], idx_to_use)
         
 class PromptListWithTemplates:
     # ... (the entire class definition remains exactly the same as before) ...
@@ -189,17 +296,52 @@ class PromptListWithTemplates:
     def __init__(self):
         os.makedirs(self.TEMPLATE_DIR, exist_ok=True)
 
+    # Template listing, re-walked only when a folder's mtime changed or a route invalidated it,
+    # and parsed template contents, loaded on first use and revalidated by mtime and size.
+    _template_index = None
+    _template_contents = {}
+    _template_lock = threading.Lock()
+
+    @staticmethod
+    def _folders_unchanged(folder_mtimes):
+        try: return all(os.stat(d).st_mtime_ns == m for d, m in folder_mtimes.items())
+        except OSError: return False
+
     @classmethod
     def get_template_files(cls):
-        if not os.path.exists(cls.TEMPLATE_DIR):
-            return []
-        template_files = []
-        for root, _, files in os.walk(cls.TEMPLATE_DIR):
-            for file in files:
-                if file.endswith(".json"):
-                    relative_path = os.path.relpath(os.path.join(root, file), cls.TEMPLATE_DIR)
-                    template_files.append(relative_path)
-        return sorted(template_files)
+        index = cls._template_index
+        if index is not None and cls._folders_unchanged(index[0]): return list(index[1])
+        with cls._template_lock:
+            if not os.path.exists(cls.TEMPLATE_DIR):
+                return []
+            folder_mtimes, template_files = {}, []
+            for root, _, files in os.walk(cls.TEMPLATE_DIR):
+                folder_mtimes[root] = os.stat(root).st_mtime_ns
+                for file in files:
+                    if file.endswith(".json"):
+                        relative_path = os.path.relpath(os.path.join(root, file), cls.TEMPLATE_DIR)
+                        template_files.append(relative_path)
+            cls._template_index = (folder_mtimes, sorted(template_files))
+            return list(cls._template_index[1])
+
+    @classmethod
+    def load_template(cls, file_path):
+        """Parsed JSON of a template, cached until the file changes."""
+        st = os.stat(file_path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = cls._template_contents.get(file_path)
+        if cached and cached[0] == stamp: return cached[1]
+        with open(file_path, 'r', encoding='utf-8') as f: data = json.load(f)
+        with cls._template_lock: cls._template_contents[file_path] = (stamp, data)
+        return data
+
+    @classmethod
+    def invalidate_templates(cls, file_path=None):
+        """Called by the save/delete routes: forgets the listing and the file's cached content."""
+        with cls._template_lock:
+            cls._template_index = None
+            if file_path is None: cls._template_contents.clear()
+            else: cls._template_contents.pop(file_path, None)
 
     @classmethod
     def INPUT_TYPES(cls):
@@ -214,7 +356,12 @@ class PromptListWithTemplates:
                 "template_file": (["None"] + cls.get_template_files(),),
                 "save_filename": ("STRING", {"default": "", "placeholder": "subfolder/template_name.json"}),
             },
-            "optional": { "optional_prompt_list": ("LIST",) }
+            "optional": {
+                "optional_prompt_list": ("LIST",),
+                "source_file": ("STRING", {"default": "", "placeholder": "prompts.txt / .jsonl / .csv (ComfyUI/input)",
+                                           "tooltip": "Adds every prompt of this file to the list. Entries are read from disk only when they are used."}),
+            },
+            "hidden": {"prompt": "PROMPT", "unique_id": "UNIQUE_ID"},
         }
 
     RETURN_TYPES = ("LIST", "STRING")
@@ -223,17 +370,25 @@ class PromptListWithTemplates:
     FUNCTION = "run"
     CATEGORY = "Santodan/Prompt"
 
-    def run(self, prompt_1, prompt_2, prompt_3, prompt_4, prompt_5, template_file, save_filename, optional_prompt_list=None):
-        prompts = []
+    def run(self, prompt_1, prompt_2, prompt_3, prompt_4, prompt_5, template_file, save_filename, optional_prompt_list=None, source_file="", prompt=None, unique_id=None):
+        prompts, lazy_parts = [], []
         if optional_prompt_list:
-            prompts.extend(optional_prompt_list)
+            # File backed lists stay on disk, the list output chains them instead of copying them.
+            if isinstance(optional_prompt_list, list): prompts.extend(optional_prompt_list)
+            else: lazy_parts.append(optional_prompt_list)
         
         source_prompts = [prompt_1, prompt_2, prompt_3, prompt_4, prompt_5]
-        for p in source_prompts:
-            if isinstance(p, str) and p.strip() != '':
-                prompts.append(p)
-                
-        return (prompts, prompts)
+        widget_prompts = [p for p in source_prompts if isinstance(p, str) and p.strip() != '']
+
+        if source_file and source_file.strip(): lazy_parts.append(FilePromptList(resolve_prompt_file(source_file)))
+        if lazy_parts:
+            prompts = ChainedPromptList([prompts] + lazy_parts + [widget_prompts])
+        else:
+            prompts.extend(widget_prompts)
+
+        # Only build the string list when something uses it, it holds every prompt in memory.
+        prompt_strings = list(prompts) if WildcardManager._output_is_linked(prompt, unique_id, 1) else []
+        return (prompts, prompt_strings)
 
 # --- API Endpoints for JavaScript interaction ---
 def get_template_dir():
@@ -248,7 +403,7 @@ class ModelAssembler:
         
         # A comprehensive list of clip types from ComfyUI's loaders
         clip_types = [
-            "stable_diffusion", "sdxl", "sd3", "stable_cascade", "flux", 
+            "auto", "stable_diffusion", "sdxl", "sd3", "stable_cascade", "flux", 
             "hunyuan_video", "hidream", "hunyuan_image", "stable_audio", 
             "mochi", "ltxv", "pixart", "cosmos", "lumina2", "wan", 
             "chroma", "ace", "omnigen2", "qwen_image"
@@ -265,35 +420,61 @@ class ModelAssembler:
                 "base_model": (checkpoints_list,),
                 "weight_dtype": (["default", "fp8_e4m3fn", "fp8_e4m3fn_fast", "fp8_e5m2"],),
                 "vae_model": (vaes_list,),
-                "clip_type": (clip_types, {"tooltip": "Select the appropriate type for your CLIP model(s). E.g., 'sdxl' for a LoRA/HiRA pair."}),
+                "clip_type": (clip_types, {"tooltip": "Select the appropriate type for your CLIP model(s). E.g., 'sdxl' for a LoRA/HiRA pair. 'auto' detects it from the .safetensors headers."}),
                 "device": (["default", "cpu"], {"advanced": True}),
                 "clip_model_1": (clips_list,),
             },
             "optional": {
                 "clip_model_2": (clips_list, {"default": "None"}),
                 "clip_model_3": (clips_list, {"default": "None"}),
+                "parallel_loading": ("BOOLEAN", {"default": True, "advanced": True,
+                                                 "tooltip": "In separate_components mode, load the UNet, VAE and CLIP files at the same time."}),
+                "inspect_headers": ("BOOLEAN", {"default": True, "advanced": True,
+                                                "tooltip": "Read the .safetensors headers first to resolve clip_type 'auto' and stop on mismatched UNet/VAE/CLIP files before loading any weights."}),
             }
         }
 
-    RETURN_TYPES = ("MODEL", "CLIP", "VAE")
+    RETURN_TYPES = ("MODEL", "CLIP", "VAE", "STRING")
+    RETURN_NAMES = ("MODEL", "CLIP", "VAE", "load_report")
     FUNCTION = "load_and_assemble"
     CATEGORY = "loaders"
 
-    def load_and_assemble(self, load_mode, ckpt_name, base_model, weight_dtype, vae_model, clip_type, clip_model_1, clip_model_2, clip_model_3, device="default"):
+    @staticmethod
+    def _timed_load(kind, paths, options, loader):
+        """Runs one cached component load, returns (component, seconds, was_cached)."""
+        start = time.perf_counter()
+        component, cached = ASSEMBLER_CACHE.get_or_load(kind, paths, options, loader)
+        return component, time.perf_counter() - start, cached
+
+    @staticmethod
+    def _format_report(rows, wall_seconds, rss_before=None, inspection=()):
+        lines = list(inspection) + [f"{kind:<10} {seconds:>7.2f}s  {'cached' if cached else 'loaded'}  {name}" for kind, name, seconds, cached in rows]
+        lines.append(f"{'total':<10} {wall_seconds:>7.2f}s  (components add up to {sum(r[2] for r in rows):.2f}s)")
+        rss_after = peak_rss_bytes()
+        if rss_after is not None:
+            # The peak only ever grows, so the increase is what this load pushed it up by.
+            grown = f" (+{format_bytes(rss_after - rss_before)} during this load)" if rss_before is not None else ""
+            lines.append(f"{'peak RSS':<10} {format_bytes(rss_after)}{grown}")
+        return "\n".join(lines)
+
+    def load_and_assemble(self, load_mode, ckpt_name, base_model, weight_dtype, vae_model, clip_type, clip_model_1, clip_model_2, clip_model_3, device="default", parallel_loading=True, inspect_headers=True):
+        wall_start, rss_before = time.perf_counter(), peak_rss_bytes()
         
         if load_mode == "full_checkpoint":
             ckpt_path = folder_paths.get_full_path("checkpoints", ckpt_name)
             if not ckpt_path: raise FileNotFoundError(f"Checkpoint file not found: {ckpt_name}")
             
-            model, clip, vae = comfy.sd.load_checkpoint_guess_config(
+            (model, clip, vae), seconds, cached = self._timed_load("checkpoint", [ckpt_path], None, lambda: comfy.sd.load_checkpoint_guess_config(
                 ckpt_path, output_vae=True, output_clip=True,
                 embedding_directory=folder_paths.get_folder_paths("embeddings")
-            )[:3]
-            return (model, clip, vae)
+            )[:3])
+            return (model, clip, vae, self._format_report([("checkpoint", ckpt_name, seconds, cached)], time.perf_counter() - wall_start, rss_before))
 
         # --- Separate Components Mode ---
+        # Each component is cached on its own, so swapping one of them only reloads that one.
+        # All paths are resolved first so a missing file fails before any loading starts.
 
-        # 1. Load UNet with correct data type
+        # 1. UNet with correct data type
         unet_options = {}
         if weight_dtype == "fp8_e4m3fn":
             unet_options["dtype"] = torch.float8_e4m3fn
@@ -305,35 +486,57 @@ class ModelAssembler:
         
         base_model_path = folder_paths.get_full_path("checkpoints", base_model)
         if not base_model_path: raise FileNotFoundError(f"Base model file not found: {base_model}")
-        model = comfy.sd.load_diffusion_model(base_model_path, model_options=unet_options)
 
-        # 2. Load VAE
+        # 2. VAE
         vae_path = folder_paths.get_full_path("vae", vae_model)
         if not vae_path: raise FileNotFoundError(f"VAE file not found: {vae_model}")
-        sd = comfy.utils.load_torch_file(vae_path)
-        vae = comfy.sd.VAE(sd=sd)
 
-        # 3. Load CLIP(s) using the correct type and device logic
-        clip_paths = []
+        # 3. CLIP(s) using the correct type and device logic
+        clip_names, clip_paths = [], []
         for clip_name in [clip_model_1, clip_model_2, clip_model_3]:
             if clip_name and clip_name != "None":
                 path = folder_paths.get_full_path("text_encoders", clip_name)
                 if not path: raise FileNotFoundError(f"CLIP file not found: {clip_name}")
+                clip_names.append(clip_name)
                 clip_paths.append(path)
         
         if not clip_paths: raise ValueError("At least one CLIP model must be selected.")
 
+        # Headers only: catches a wrong clip_type or mismatched files before gigabytes are read.
+        inspection = []
+        if inspect_headers:
+            clip_type, inspection = inspect_components(base_model_path, vae_path, clip_paths, clip_type)
+        elif clip_type == "auto":
+            raise ValueError("clip_type 'auto' needs inspect_headers enabled.")
+
         clip_options = {}
         if device == "cpu":
             clip_options["load_device"] = clip_options["offload_device"] = torch.device("cpu")
 
         clip_target_type = getattr(comfy.sd.CLIPType, clip_type.upper(), comfy.sd.CLIPType.STABLE_DIFFUSION)
-        
-        clip = comfy.sd.load_clip(
-            ckpt_paths=clip_paths,
-            embedding_directory=folder_paths.get_folder_paths("embeddings"),
-            clip_type=clip_target_type,
-            model_options=clip_options
-        )
-
-        return (model, clip, vae)
+
+        jobs = {
+            "unet": (base_model, ("unet", [base_model_path], unet_options,
+                                  lambda: comfy.sd.load_diffusion_model(base_model_path, model_options=unet_options))),
+            "vae": (vae_model, ("vae", [vae_path], None, lambda: comfy.sd.VAE(sd=comfy.utils.load_torch_file(vae_path)))),
+            "clip": (" + ".join(clip_names), ("clip", clip_paths, {**clip_options, "clip_type": clip_target_type}, lambda: comfy.sd.load_clip(
+                ckpt_paths=clip_paths,
+                embedding_directory=folder_paths.get_folder_paths("embeddings"),
+                clip_type=clip_target_type,
+                model_options=clip_options
+            ))),
+        }
+
+        # The components are independent files, loading them side by side overlaps disk reads
+        # and deserialization, so a cold start takes about as long as the slowest one.
+        if parallel_loading:
+            with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="santodan-assembler") as pool:
+                futures = {kind: pool.submit(self._timed_load, *args) for kind, (_, args) in jobs.items()}
+                results = {kind: future.result() for kind, future in futures.items()}
+        else:
+            results = {kind: self._timed_load(*args) for kind, (_, args) in jobs.items()}
+
+        rows = [(kind, jobs[kind][0], seconds, cached) for kind, (_, seconds, cached) in results.items()]
+        report = self._format_report(rows, time.perf_counter() - wall_start, rss_before, inspection)
+        if not all(cached for *_, cached in rows): print(f"[Santodan Model Assembler] Components ready:\n{report}")
+        return (results["unet"][0], results["clip"][0], results["vae"][0], report)
@@ -1,19 +1,143 @@
 import os
 import random
 import re
-import folder_paths
-import yaml
+import time
+from .wildcard_store import YamlWildcardIndex, TextWildcardIndex, WildcardCatalog, GlobOptions
+from .cursor_store import CursorStore, cursor_scope
+from .wildcard_enumerate import TemplateEnumerator
+from .wildcard_dedup import SeenWindow
+from .wildcard_stats import STATS
+from .wildcard_worker import ExpansionPool, WorkerError
+from datetime import datetime
+from contextlib import contextmanager
+
+# folder_paths is imported where it's used: the parallel expansion workers load this module without ComfyUI.
+
+# Below this many lines the process pool costs more than it saves.
+PARALLEL_MIN_LINES = 256
+# Seconds the worker processes get for one chunk before they are stopped and it is expanded serially.
+PARALLEL_TIMEOUT = 120
+# Lines read and expanded per step when streaming.
+STREAM_CHUNK_LINES = 4096
+# Expanded lines shown in the node preview when writing to an output file.
+STREAM_PREVIEW_LINES = 50
+# Random re-rolls before a unique sampler falls back to scanning the enumeration.
+UNIQUE_REROLLS = 16
+# Largest template (in combinations) the unique sampler will scan for an unused one.
+UNIQUE_SCAN_LIMIT = 1000000
+
+class WildcardExpansionError(Exception):
+    """
+    Raised when a prompt can't be expanded within the limits.
+    `kind` is one of "cycle", "depth", "expansions" or "length", `stack` is the chain of
+    wildcards/choices being expanded when it happened.
+    """
+    def __init__(self, kind, message, stack=(), limit=None):
+        super().__init__(message)
+        self.kind, self.message, self.stack, self.limit = kind, message, tuple(stack), limit
+
+    def __reduce__(self):
+        return (WildcardExpansionError, (self.kind, self.message, self.stack, self.limit))
+
+    def __str__(self):
+        trail = " -> ".join(self.stack)
+        return f"[Wildcard Manager] {self.message}" + (f" (at: {trail})" if trail else "")
+
+    def to_dict(self):
+        return {"kind": self.kind, "message": self.message, "stack": list(self.stack), "limit": self.limit}
+
+class ExpansionState:
+    """Recursion stack and budget for one top-level _process_syntax call."""
+    def __init__(self, max_depth, max_expansions, max_length):
+        self.max_depth, self.max_expansions, self.max_length = max_depth, max_expansions, max_length
+        self.stack = []
+        self.expansions = 0
+
+    @contextmanager
+    def frame(self, label, is_wildcard=False):
+        # Choices are shown as {text} so they can never be mistaken for a `__wildcard__` frame.
+        if not is_wildcard: label = "{" + (label if len(label) <= 40 else label[:37] + "...") + "}"
+        if is_wildcard and label in self.stack:
+            raise WildcardExpansionError("cycle", f"Wildcard {label} references itself", self.stack + [label])
+        if len(self.stack) >= self.max_depth:
+            raise WildcardExpansionError("depth", f"Nesting is deeper than {self.max_depth} levels", self.stack + [label], self.max_depth)
+        self.expansions += 1
+        if self.expansions > self.max_expansions:
+            raise WildcardExpansionError("expansions", f"More than {self.max_expansions} expansions in one prompt", self.stack + [label], self.max_expansions)
+        self.stack.append(label)
+        try: yield
+        finally: self.stack.pop()
+
+    def check_length(self, text):
+        if len(text) > self.max_length:
+            raise WildcardExpansionError("length", f"Expanded text is longer than {self.max_length} characters", self.stack, self.max_length)
+        return text
+
+def _line_rng(seed, line_number):
+    """Per-line RNG so a line expands the same way no matter which process handles it."""
+    return random.Random(f"{seed}:{line_number}")
+
+def _iter_text_lines(text):
+    """Lazy equivalent of text.split('\\n')."""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+def _resolve_io_path(path, default_dir):
+    """
+    Paths are taken from ComfyUI's input/output folder, %date:yyyy-MM-dd% is expanded.
+    Anything that ends up outside that folder (absolute paths, `..`) raises ValueError.
+    """
+    if '%date:' in path:
+        path = path.replace('%date:yyyy-MM-dd%', datetime.now().strftime('%Y-%m-%d'))
+    root = os.path.abspath(default_dir)
+    full_path = os.path.abspath(os.path.join(root, path))
+    try: inside = os.path.commonpath([root, full_path]) == root
+    except ValueError: inside = False
+    if not inside: raise ValueError(f"[Santodan Wildcard Manager] '{path}' is outside {root}")
+    return full_path
+
+def _write_lines(lines, path):
+    """Streams lines to `path`, returns (first STREAM_PREVIEW_LINES lines, total written)."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    preview, count = [], 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line + '\n')
+            if count < STREAM_PREVIEW_LINES: preview.append(line)
+            count += 1
+    return preview, count
 
 class WildcardManager:
-    global_sync_index = 0
+    _all_wildcards_cache = (None, "")
     OUTPUT_NODE = True
+    # Default (max_depth, max_expansions, max_length) for one prompt.
+    DEFAULT_LIMITS = (32, 10000, 100000)
 
     def __init__(self):
-        pass
+        self.expansion_limits = self.DEFAULT_LIMITS
+        self.cursor_scope = cursor_scope(None)
+        self.cursors_used = set()
+        self.glob_weighting = "by line count"
+
+    @staticmethod
+    def get_cursor_store():
+        return CursorStore.open("wildcard_cursors")
+
+    def _sequential_index(self, token, option_count):
+        """Position of a `+` token for this node; every token keeps its own persistent cursor."""
+        self.cursors_used.add(token)
+        return self.get_cursor_store().get(self.cursor_scope, token) % option_count
 
     @classmethod
     def get_wildcards_path(cls):
         """Centralized path logic using ComfyUI's base path."""
+        import folder_paths
         path = os.path.join(folder_paths.base_path, "wildcards")
         if not os.path.exists(path):
             os.makedirs(path, exist_ok=True)
@@ -23,31 +147,59 @@ class WildcardManager:
     def IS_CHANGED(cls, **kwargs):
         return float("NaN")
 
+    @classmethod
+    def get_wildcard_catalog(cls):
+        return WildcardCatalog.for_root(cls.get_wildcards_path())
+
     @classmethod
     def get_wildcard_files(cls):
-        wildcards_path = cls.get_wildcards_path()
-        file_list = []
-        try:
-            for root, _, files in os.walk(wildcards_path):
-                for file in files:
-                    if file.lower().endswith(('.txt', '.yaml', '.yml')):
-                        rel = os.path.relpath(os.path.join(root, file), wildcards_path)
-                        name = rel.replace('\\', '/')
-                        if name.lower().endswith('.txt'): name = name[:-4]
-                        file_list.append(name)
-            return ["[Create New]"] + sorted(file_list, key=str.lower)
+        try: return ["[Create New]"] + cls.get_wildcard_catalog().names()
         except Exception: return ["[Create New]", "(Error)"]
 
+    @classmethod
+    def get_all_wildcards_string(cls):
+        """The `all_wildcards` output, rebuilt only when the catalog version changes."""
+        catalog = cls.get_wildcard_catalog()
+        version, cached = cls._all_wildcards_cache
+        if version != catalog.version:
+            version = catalog.version
+            cached = "\n".join(f"__{w}__" for w in catalog.names())
+            cls._all_wildcards_cache = (version, cached)
+        return cached
+
+    @staticmethod
+    def _output_is_linked(prompt, unique_id, output_index):
+        """True when some node in the prompt graph takes this node's output as input (or we can't tell)."""
+        if not isinstance(prompt, dict) or unique_id is None: return True
+        for node in prompt.values():
+            for value in node.get("inputs", {}).values():
+                if isinstance(value, list) and len(value) == 2 and str(value[0]) == str(unique_id) and value[1] == output_index:
+                    return True
+        return False
+
     @classmethod
     def INPUT_TYPES(cls):
         return {
             "required": {
                 "wildcards_list": (cls.get_wildcard_files(),),
                 "input_text": ("STRING", {"multiline": True, "default": "A {*cute|big|small} {+cat|dog} is sitting on the __object__."}),
-                "processing_mode": (["entire text as one","line by line"],),
+                "processing_mode": (["entire text as one","line by line","enumerate combinations"],),
                 "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),
             },
-            "hidden": { "prompt": "PROMPT", "extra_pnginfo": "EXTRA_PNGINFO" }
+            "optional": {
+                "parallel_workers": ("INT", {"default": 1, "min": 0, "max": 64, "tooltip": "Line by line only. 1 = serial, 0 = one worker per CPU core."}),
+                "input_file": ("STRING", {"default": "", "tooltip": "Read prompts from this file instead of input_text (relative to the ComfyUI input folder)."}),
+                "output_file": ("STRING", {"default": "", "tooltip": "Line by line only. Stream the expanded lines to this file (relative to the ComfyUI output folder) instead of returning them; the outputs carry the file path."}),
+                "enumerate_start": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff, "tooltip": "Enumerate mode only. Index of the first combination to output."}),
+                "enumerate_count": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff, "tooltip": "Enumerate mode only. How many combinations to output from enumerate_start, 0 = all."}),
+                "glob_weighting": (["by line count", "by file"], {"tooltip": "How __folder/*__ references pick: every line of the matched files equally likely, or every file equally likely."}),
+                "unique_outputs": (["off", "within run", "persistent window"], {"tooltip": "Line by line / entire text only. Re-roll expansions that were already produced in this run, or in the last unique_window outputs of this node."}),
+                "unique_window": ("INT", {"default": 10000, "min": 1, "max": 100000000, "tooltip": "How many recent outputs the persistent window remembers."}),
+                "max_depth": ("INT", {"default": cls.DEFAULT_LIMITS[0], "min": 1, "max": 1000, "advanced": True, "tooltip": "Maximum nesting of choices and wildcards in one prompt."}),
+                "max_expansions": ("INT", {"default": cls.DEFAULT_LIMITS[1], "min": 1, "max": 10000000, "advanced": True, "tooltip": "Maximum number of choices and wildcards expanded for one prompt."}),
+                "max_length": ("INT", {"default": cls.DEFAULT_LIMITS[2], "min": 1, "max": 100000000, "advanced": True, "tooltip": "Maximum length in characters of one expanded prompt."}),
+            },
+            "hidden": { "prompt": "PROMPT", "extra_pnginfo": "EXTRA_PNGINFO", "unique_id": "UNIQUE_ID" }
         }
 
     RETURN_TYPES = ("STRING", "STRING", "STRING",)
@@ -57,36 +209,32 @@ class WildcardManager:
     CATEGORY = "Santodan/Wildcard"
 
     def _get_wildcard_options(self, wildcard_name):
-        import yaml
+        start = time.perf_counter()
+        options = self._read_wildcard_options(wildcard_name)
+        elapsed = time.perf_counter() - start
+        STATS.add_time("wildcard_lookup", elapsed)
+        STATS.record_wildcard(wildcard_name, elapsed, len(options))
+        return options
+
+    def _read_wildcard_options(self, wildcard_name):
         wildcards_path = self.get_wildcards_path()
         
-        # 1. Check if it's a YAML path (e.g., styles.yaml/lighting)
+        # 1. Check if it's a YAML path (e.g., styles.yaml/lighting or styles.yaml/*)
         if ".yaml" in wildcard_name.lower() or ".yml" in wildcard_name.lower():
             parts = wildcard_name.split('/')
-            file_path, yaml_keys = None, []
             for i, part in enumerate(parts):
                 if part.lower().endswith(('.yaml', '.yml')):
                     file_path = os.path.join(wildcards_path, *parts[:i+1])
-                    yaml_keys = parts[i+1:]
-                    break
-            
-            if file_path and os.path.exists(file_path):
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = yaml.safe_load(f)
-                    for key in yaml_keys:
-                        data = data.get(key) if isinstance(data, dict) else None
-                    if isinstance(data, list): return [str(x) for x in data]
-                except Exception: pass
+                    return YamlWildcardIndex.get_options(file_path, "/".join(parts[i+1:]))
             return []
 
-        # 2. Default logic: It's a .txt file (user just typed __test__)
+        # 2. Folder glob (e.g., clothing/* or clothing/**), resolved from the wildcard catalog
+        if '*' in wildcard_name:
+            return self.get_wildcard_catalog().glob_options(wildcard_name)
+
+        # 3. Default logic: It's a .txt file (user just typed __test__)
         # We manually add the .txt here because the UI sends the name without it
-        wildcard_file_path = os.path.join(wildcards_path, f"{wildcard_name}.txt")
-        if os.path.exists(wildcard_file_path):
-            with open(wildcard_file_path, 'r', encoding='utf-8') as f:
-                return [line for line in (l.strip() for l in f) if line and not line.startswith('#')]
-        return []
+        return TextWildcardIndex.get_options(os.path.join(wildcards_path, f"{wildcard_name}.txt"))
     
     def _parse_range(self, range_str, opt_count, rng):
         if not range_str: return 1
@@ -99,13 +247,18 @@ class WildcardManager:
             else: return int(range_str)
         except ValueError: return 1
 
-    def _process_syntax(self, text, seeded_rng):
-        quantifier_pattern = re.compile(r'(\d+)#(__[\w\s\./\-\\]+?__)')
+    def _process_syntax(self, text, seeded_rng, state=None):
+        if state is None:
+            with STATS.timer("expand"):
+                return self._process_syntax(text, seeded_rng, ExpansionState(*self.expansion_limits))
+        quantifier_pattern = re.compile(r'(\d+)#(__[\w\s\./\-\\*]+?__)')
         def expand_quantifier(match):
             count, wc = int(match.group(1)), match.group(2)
+            if count > state.max_expansions:
+                raise WildcardExpansionError("expansions", f"Quantifier {count}# is larger than {state.max_expansions}", state.stack + [match.group(0)], state.max_expansions)
             return '|'.join([wc] * count)
         while quantifier_pattern.search(text):
-            text = quantifier_pattern.sub(expand_quantifier, text)
+            text = state.check_length(quantifier_pattern.sub(expand_quantifier, text))
 
         dynamic_pattern = re.compile(r'\{([*+]?)([^{}]+)\}')
         while True:
@@ -121,19 +274,20 @@ class WildcardManager:
                 else: range_str, sep, opt_str = parts[0], ", ", parts[1]
                 options = opt_str.split('|')
                 if use_sequential:
-                    choice_idx = WildcardManager.global_sync_index % len(options)
-                    selected = [options[choice_idx]]
+                    selected = [options[self._sequential_index(match.group(0), len(options))]]
                 else:
                     num_to_select = self._parse_range(range_str, len(options), current_rng)
                     num_to_select = max(0, min(num_to_select, len(options)))
                     selected = current_rng.sample(options, num_to_select)
-                processed = [self._process_syntax(s, seeded_rng) for s in selected]
+                processed = []
+                for s in selected:
+                    with state.frame(s):
+                        processed.append(self._process_syntax(s, seeded_rng, state))
                 replacement = sep.join(processed)
             else:
                 options = content.split('|')
                 if use_sequential:
-                    idx = WildcardManager.global_sync_index % len(options)
-                    choice = options[idx]
+                    choice = options[self._sequential_index(match.group(0), len(options))]
                 else:
                     weights, clean_options = [], []
                     for opt in options:
@@ -145,46 +299,181 @@ class WildcardManager:
                             weights.append(1.0)
                             clean_options.append(opt)
                     choice = current_rng.choices(clean_options, weights=weights, k=1)[0]
-                replacement = self._process_syntax(choice, seeded_rng)
-            text = text[:match.start()] + replacement + text[match.end():]
+                with state.frame(choice):
+                    replacement = self._process_syntax(choice, seeded_rng, state)
+            text = state.check_length(text[:match.start()] + replacement + text[match.end():])
 
-        wildcard_pattern = re.compile(r'__([*+]?)([\w\s\./\-\\]+?)__')
+        wildcard_pattern = re.compile(r'__([*+]?)([\w\s\./\-\\*]+?)__')
         while True:
             match = wildcard_pattern.search(text)
             if not match: break
             prefix, wc_name = match.group(1), match.group(2)
             options = self._get_wildcard_options(wc_name)
             if options:
-                if prefix == '+': choice = options[WildcardManager.global_sync_index % len(options)]
-                elif prefix == '*': choice = random.Random().choice(options)
-                else: choice = seeded_rng.choice(options)
-                replacement = self._process_syntax(choice, seeded_rng)
-                text = text[:match.start()] + replacement + text[match.end():]
+                if prefix == '+': choice = options[self._sequential_index(f"__{wc_name}__", len(options))]
+                else:
+                    rng = random.Random() if prefix == '*' else seeded_rng
+                    if isinstance(options, GlobOptions) and self.glob_weighting == "by file": choice = options.choice_by_file(rng)
+                    else: choice = rng.choice(options)
+                with state.frame(f"__{wc_name}__", is_wildcard=True):
+                    replacement = self._process_syntax(choice, seeded_rng, state)
+                text = state.check_length(text[:match.start()] + replacement + text[match.end():])
             else:
                 text = text[:match.start()] + text[match.end():].lstrip()
         return text
 
-    def process_text(self, wildcards_list, input_text, processing_mode, seed, **kwargs):
-        text = input_text
-        if isinstance(text, list): text = "\n".join(text)
-        rng = random.Random(seed)
-        processed_texts = []
-        input_lines = text.split('\n')
+    def _expand_lines(self, lines, seed, workers, pool=None):
+        """Expands (line_number, line) pairs, sharding them across worker processes when worth it."""
+        if workers > 1 and len(lines) >= PARALLEL_MIN_LINES and (pool is None or pool.alive):
+            own_pool = pool is None
+            try:
+                if own_pool: pool = ExpansionPool(workers)
+                return self._expand_on_pool(pool, lines, seed, workers)
+            except WorkerError as e:
+                if e.details.get("kind"): raise WildcardExpansionError(**e.details)
+                print(f"[Santodan Wildcard Manager] Parallel expansion failed ({e}), falling back to serial.")
+            except Exception as e:
+                # Timeouts and dead workers: later chunks of this run go straight to serial.
+                if pool is not None: pool.close(kill=True)
+                print(f"[Santodan Wildcard Manager] Parallel expansion failed ({e}), falling back to serial.")
+            finally:
+                if own_pool and pool is not None and pool.alive: pool.close()
+        return [self._process_syntax(line, _line_rng(seed, n)) for n, line in lines]
+
+    def _expand_on_pool(self, pool, lines, seed, workers):
+        shard_size = -(-len(lines) // workers)
+        shards = [lines[i:i + shard_size] for i in range(0, len(lines), shard_size)]
+        expanded = []
+        settings = {"wildcards_path": self.get_wildcards_path(), "cursor_scope": self.cursor_scope,
+                    "expansion_limits": self.expansion_limits, "glob_weighting": self.glob_weighting}
+        for texts, used in pool.map(shards, seed, settings, PARALLEL_TIMEOUT):
+            expanded.extend(texts)
+            self.cursors_used |= used
+        return expanded
+
+    def _expand_unique(self, text, rng, reroll_key, seen):
+        """
+        Expands `text` to something not in `seen`: re-rolls a few times, then looks for an unseen
+        combination through the enumerator. If every combination was already used it gives up
+        and returns a repeat.
+        """
+        result = self._process_syntax(text, rng)
+        for attempt in range(1, UNIQUE_REROLLS + 1):
+            if result not in seen: break
+            result = self._process_syntax(text, random.Random(f"{reroll_key}:{attempt}"))
+        else:
+            if result in seen: result = self._unseen_combination(text, seen, rng) or result
+        seen.add(result)
+        return result
+
+    def _unseen_combination(self, text, seen, rng):
+        try: enumerator = TemplateEnumerator(self, text, self.expansion_limits[0])
+        except WildcardExpansionError: return None
+        if enumerator.count > UNIQUE_SCAN_LIMIT: return None
+        start = rng.randrange(enumerator.count) if enumerator.count else 0
+        for i in range(enumerator.count):
+            candidate = enumerator.get((start + i) % enumerator.count)
+            if candidate not in seen: return candidate
+        print(f"[Santodan Wildcard Manager] All {enumerator.count} combinations of '{text[:60]}' were already used, repeating one.")
+        return None
+
+    def iter_expanded_lines(self, lines, seed, workers=1, chunk_lines=STREAM_CHUNK_LINES, seen=None):
+        """
+        Generator version of "line by line" mode. `lines` can be any iterable (an open file works),
+        only `chunk_lines` inputs and their expansions are held in memory at once.
+        With a `seen` window every output is made unique against it (this always runs serially).
+        """
+        if seen is not None:
+            for n, line in enumerate(lines):
+                line = line.strip()
+                if line and not line.startswith('#'): yield self._expand_unique(line, _line_rng(seed, n), f"{seed}:{n}", seen)
+            return
+        if workers == 0: workers = os.cpu_count() or 1
+        pool = ExpansionPool(workers) if workers > 1 else None
+        try:
+            chunk = []
+            for n, line in enumerate(lines):
+                line = line.strip()
+                if not line or line.startswith('#'): continue
+                chunk.append((n, line))
+                if len(chunk) >= chunk_lines:
+                    yield from self._expand_lines(chunk, seed, workers, pool)
+                    chunk = []
+            if chunk: yield from self._expand_lines(chunk, seed, workers, pool)
+        finally:
+            if pool is not None and pool.alive: pool.close()
+
+    @contextmanager
+    def _open_input_lines(self, input_text, input_file):
+        """Yields a lazy line iterator over either the input file or the text widget."""
+        if input_file:
+            import folder_paths
+            with open(_resolve_io_path(input_file, folder_paths.get_input_directory()), 'r', encoding='utf-8') as f:
+                yield f
+        else:
+            if isinstance(input_text, list): input_text = "\n".join(input_text)
+            yield _iter_text_lines(input_text)
+
+    def process_text(self, wildcards_list, input_text, processing_mode, seed, parallel_workers=1, input_file="", output_file="",
+                     max_depth=DEFAULT_LIMITS[0], max_expansions=DEFAULT_LIMITS[1], max_length=DEFAULT_LIMITS[2],
+                     enumerate_start=0, enumerate_count=0, unique_outputs="off", unique_window=10000,
+                     glob_weighting="by line count", **kwargs):
+        self.expansion_limits = (max_depth, max_expansions, max_length)
+        self.glob_weighting = glob_weighting
+        self.cursor_scope = cursor_scope(kwargs.get("unique_id"), kwargs.get("extra_pnginfo"))
+        self.cursors_used = set()
+        input_file, output_file = input_file.strip(), output_file.strip()
+        seen = None
+        if unique_outputs == "within run": seen = SeenWindow()
+        elif unique_outputs == "persistent window": seen = SeenWindow.for_scope(self.cursor_scope, unique_window)
+        processed_texts = preview = []
         if processing_mode == "entire text as one":
-            clean_text = "\n".join([l for l in input_lines if not l.strip().startswith('#')]).strip()
-            if clean_text: processed_texts.append(self._process_syntax(clean_text, rng))
+            with self._open_input_lines(input_text, input_file) as lines:
+                clean_text = "\n".join([l.rstrip('\n') for l in lines if not l.strip().startswith('#')]).strip()
+            if clean_text and seen is not None: processed_texts.append(self._expand_unique(clean_text, random.Random(seed), seed, seen))
+            elif clean_text: processed_texts.append(self._process_syntax(clean_text, random.Random(seed)))
         else:
-            for line in input_lines:
-                if not line.strip() or line.strip().startswith('#'): continue
-                processed_texts.append(self._process_syntax(line.strip(), rng))
+            with self._open_input_lines(input_text, input_file) as lines:
+                if processing_mode == "enumerate combinations":
+                    clean_text = "\n".join([l.rstrip('\n') for l in lines if not l.strip().startswith('#')]).strip()
+                    enumerator = TemplateEnumerator(self, clean_text, max_depth)
+                    print(f"[Santodan Wildcard Manager] Template has {enumerator.count} combinations.")
+                    expanded = enumerator.iter(enumerate_start, enumerate_start + enumerate_count if enumerate_count else None)
+                else:
+                    expanded = self.iter_expanded_lines(lines, seed, parallel_workers, seen=seen)
+                if output_file:
+                    import folder_paths
+                    out_path = _resolve_io_path(output_file, folder_paths.get_output_directory())
+                    preview, count = _write_lines(expanded, out_path)
+                    print(f"[Santodan Wildcard Manager] Wrote {count} expanded lines to {out_path}")
+                    processed_texts = [out_path]
+                else:
+                    processed_texts = preview = list(expanded)
 
-        WildcardManager.global_sync_index += 1
+        if seen is not None: seen.save()
+        # Every `+` token that was used moves on by one for the next run.
+        self.get_cursor_store().advance(self.cursor_scope, self.cursors_used)
         if not processed_texts: processed_texts.append("")
-        all_wc = self.get_wildcard_files()
-        all_wc_str = "\n".join([f"__{w}__" for w in all_wc if w not in ["[Create New]", "(Error reading folder)"]])
+        # Skip the catalog entirely for prompt-only runs.
+        all_wc_str = self.get_all_wildcards_string() if self._output_is_linked(kwargs.get("prompt"), kwargs.get("unique_id"), 2) else ""
         processed_string = "\n".join(processed_texts)
-        
+
         return {
-            "ui": {"preview_list": processed_texts}, 
+            "ui": {"preview_list": preview or processed_texts},
             "result": (processed_texts, processed_string, all_wc_str,)
-        }
\ No newline at end of file
+        }
+class _WorkerManager(WildcardManager):
+    """WildcardManager of a worker process, reading from the wildcards folder the server sent."""
+    root = None
+
+    @classmethod
+    def get_wildcards_path(cls):
+        return cls.root
+
+def expand_shard(shard, seed, settings):
+    """Worker process entry point: expands one shard of (line_number, line) pairs, also returns the `+` cursors it used."""
+    settings = dict(settings)
+    _WorkerManager.root = settings.pop("wildcards_path")
+    manager = _WorkerManager()
+    manager.__dict__.update(settings)
+    return [manager._process_syntax(line, _line_rng(seed, n)) for n, line in shard], manager.cursors_used
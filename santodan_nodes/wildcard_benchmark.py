@@ -0,0 +1,148 @@
+"""
+Throughput benchmarks for the Wildcard Manager expansion engine.
+
+Run from the custom node folder with ComfyUI on the PYTHONPATH:
+    python -m santodan_nodes.wildcard_benchmark            # scaling by core count
+    python -m santodan_nodes.wildcard_benchmark --suite    # synthetic wildcard tree suite
+    python -m santodan_nodes.wildcard_benchmark --suite --json results.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from .wildcard import WildcardManager
+from .wildcard_stats import STATS
+
+def make_synthetic_lines(count, seed=0):
+    """Builds `count` prompt lines using nested, weighted and multi-select syntax."""
+    rng = random.Random(seed)
+    subjects = "|".join(f"subject {i}" for i in range(50))
+    styles = "|".join(f"{rng.randint(1, 5)}::style {i}" for i in range(30))
+    return [
+        f"line {n}, a {{{subjects}}} in {{{styles}}}, {{1-3$$, $${{red|green|blue}}|{{day|night}}|{{indoor|outdoor}}}}"
+        for n in range(count)
+    ]
+
+def benchmark_parallel_scaling(line_count=20000, core_counts=None, seed=0):
+    """Times line by line expansion for each worker count and checks it matches the serial output."""
+    if core_counts is None:
+        max_cores = os.cpu_count() or 1
+        core_counts = sorted({1, 2, 4, 8, 16, max_cores} & set(range(1, max_cores + 1)))
+    text = "\n".join(make_synthetic_lines(line_count, seed))
+    manager = WildcardManager()
+    results, baseline = [], None
+    for workers in core_counts:
+        start = time.perf_counter()
+        output = manager.process_text("", text, "line by line", seed, parallel_workers=workers)["result"][0]
+        elapsed = time.perf_counter() - start
+        if baseline is None: baseline = (output, elapsed)
+        results.append({
+            "workers": workers,
+            "seconds": round(elapsed, 3),
+            "lines_per_second": round(line_count / elapsed),
+            "speedup": round(baseline[1] / elapsed, 2),
+            "identical": output == baseline[0],
+        })
+    return results
+
+def build_synthetic_tree(root, seed=0, small_files=200, small_lines=50, large_lines=200000, depth=20):
+    """
+    Writes a reproducible wildcards folder:
+    - small/NNN.txt: many small files, some referencing each other
+    - large.txt: one big file (name/tag dump style)
+    - deep/level_N.txt: a chain where every level references the next one
+    - pack.yaml: a nested YAML pack for key and glob lookups
+    """
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(root, "small"), exist_ok=True)
+    for i in range(small_files):
+        with open(os.path.join(root, "small", f"{i:03d}.txt"), 'w', encoding='utf-8') as f:
+            for j in range(small_lines):
+                ref = f" with __small/{rng.randrange(i):03d}__" if i and rng.random() < 0.1 else ""
+                f.write(f"item {i}-{j}{ref}\n")
+    with open(os.path.join(root, "large.txt"), 'w', encoding='utf-8') as f:
+        for i in range(large_lines): f.write(f"tag_{i}_{rng.randrange(10**6)}\n")
+    os.makedirs(os.path.join(root, "deep"), exist_ok=True)
+    for level in range(depth):
+        with open(os.path.join(root, "deep", f"level_{level}.txt"), 'w', encoding='utf-8') as f:
+            nxt = f" {{a|b}} __deep/level_{level + 1}__" if level + 1 < depth else ""
+            f.write(f"level {level}{nxt}\n")
+    with open(os.path.join(root, "pack.yaml"), 'w', encoding='utf-8') as f:
+        for group in range(20):
+            f.write(f"group{group}:\n")
+            for key in range(10):
+                f.write(f"  key{key}:\n" + "".join(f"    - value {group}.{key}.{v}\n" for v in range(20)))
+
+SUITE_CASES = {
+    "small_files": lambda rng: f"a __small/{rng.randrange(200):03d}__ and __small/{rng.randrange(200):03d}__",
+    "large_file": lambda rng: "__large__, __large__, __large__",
+    "deep_nesting": lambda rng: "__deep/level_0__",
+    "yaml_keys": lambda rng: f"__pack.yaml/group{rng.randrange(20)}/key{rng.randrange(10)}__",
+    "yaml_glob": lambda rng: "__pack.yaml/group1/*__",
+    "multi_select": lambda rng: "{2-4$$, $$__small/001__|__small/002__|__small/003__|{x|y|z}|__pack.yaml/group2/key3__}",
+}
+
+class _SuiteManager(WildcardManager):
+    """WildcardManager reading from the synthetic tree instead of ComfyUI/wildcards."""
+    root = None
+
+    @classmethod
+    def get_wildcards_path(cls):
+        return cls.root
+
+def run_suite(lines_per_case=2000, seed=0, root=None):
+    """Times each SUITE_CASES template over `lines_per_case` lines; returns one row per case with its stats."""
+    own_root = root is None
+    if own_root:
+        root = tempfile.mkdtemp(prefix="santodan_wildcard_bench_")
+        build_synthetic_tree(root, seed)
+    _SuiteManager.root = root
+    manager = _SuiteManager()
+    rows = []
+    try:
+        for name, make in SUITE_CASES.items():
+            rng = random.Random(seed)
+            text = "\n".join(make(rng) for _ in range(lines_per_case))
+            STATS.reset()
+            start = time.perf_counter()
+            manager.process_text("", text, "line by line", seed)
+            elapsed = time.perf_counter() - start
+            snap = STATS.snapshot(top=0)
+            rows.append({
+                "case": name,
+                "seconds": round(elapsed, 4),
+                "lines_per_second": round(lines_per_case / elapsed),
+                "wildcard_lookup_seconds": snap["timers"].get("wildcard_lookup", {}).get("seconds", 0.0),
+                "syntax_seconds": snap["syntax_seconds"],
+                "counters": snap["counters"],
+                "cache": snap["cache"],
+            })
+    finally:
+        if own_root: shutil.rmtree(root, ignore_errors=True)
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Wildcard Manager benchmarks")
+    parser.add_argument("--suite", action="store_true", help="run the synthetic wildcard tree suite instead of the scaling run")
+    parser.add_argument("--lines", type=int, default=None, help="lines per run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+    if args.suite:
+        results = run_suite(args.lines or 2000, args.seed)
+        for row in results:
+            print(f"{row['case']:<14} {row['seconds']:>8}s  {row['lines_per_second']:>8} lines/s  lookups {row['wildcard_lookup_seconds']}s  syntax {row['syntax_seconds']}s  {row['counters']}")
+    else:
+        results = benchmark_parallel_scaling(args.lines or 20000, seed=args.seed)
+        for row in results:
+            print(f"{row['workers']:>3} workers: {row['seconds']:>8}s  {row['lines_per_second']:>8} lines/s  x{row['speedup']:<5}  identical={row['identical']}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"python": sys.version.split()[0], "cpu_count": os.cpu_count(), "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import hashlib
+from array import array
+from collections import deque
+from .cursor_store import data_dir
+
+def fingerprint(text):
+    """64-bit hash of an expanded prompt; collisions are rare enough to only cost a re-roll."""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+class SeenWindow:
+    """
+    Fingerprints of the most recent `capacity` outputs (None = unbounded), oldest forgotten first.
+    With a `path` the window is loaded from and saved to a flat uint64 file, so it survives restarts.
+    """
+    def __init__(self, capacity=None, path=None):
+        self.capacity, self.path = capacity, path
+        self._order, self._set = deque(), set()
+        if path and os.path.exists(path):
+            data = array('Q')
+            try:
+                with open(path, 'rb') as f: data.frombytes(f.read())
+            except (OSError, ValueError) as e:
+                print(f"[Santodan Wildcard Manager] Could not read seen window {path}: {e}")
+            for fp in data[-capacity:] if capacity else data: self._add(fp)
+
+    @classmethod
+    def for_scope(cls, scope, capacity):
+        name = hashlib.sha1(scope.encode('utf-8')).hexdigest()
+        return cls(capacity, data_dir("state", "wildcard_seen", f"{name}.bin"))
+
+    def __len__(self):
+        return len(self._set)
+
+    def __contains__(self, text):
+        return fingerprint(text) in self._set
+
+    def _add(self, fp):
+        if fp in self._set: return
+        self._order.append(fp)
+        self._set.add(fp)
+        while self.capacity and len(self._order) > self.capacity:
+            self._set.discard(self._order.popleft())
+
+    def add(self, text):
+        self._add(fingerprint(text))
+
+    def clear(self):
+        self._order.clear()
+        self._set.clear()
+
+    def save(self):
+        if not self.path: return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f: f.write(array('Q', self._order).tobytes())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,242 @@
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from math import comb
+
+# Same token rules as WildcardManager._process_syntax.
+QUANTIFIER_PATTERN = re.compile(r'(\d+)#(__[\w\s\./\-\\*]+?__)')
+WILDCARD_PATTERN = re.compile(r'__([*+]?)([\w\s\./\-\\*]+?)__')
+
+def _expand_quantifiers(text):
+    while QUANTIFIER_PATTERN.search(text):
+        text = QUANTIFIER_PATTERN.sub(lambda m: '|'.join([m.group(2)] * int(m.group(1))), text)
+    return text
+
+def _split_top_level(text, sep):
+    """Splits on `sep` outside of {...} groups."""
+    parts, depth, start, i = [], 0, 0, 0
+    while i < len(text):
+        c = text[i]
+        if c == '{': depth += 1
+        elif c == '}': depth = max(0, depth - 1)
+        elif depth == 0 and text.startswith(sep, i):
+            parts.append(text[start:i])
+            i += len(sep)
+            start = i
+            continue
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+def _matching_brace(text, start):
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == '{': depth += 1
+        elif text[i] == '}':
+            depth -= 1
+            if depth == 0: return i
+    return -1
+
+class _Literal:
+    def __init__(self, text):
+        self.text, self.count = text, 1
+
+    def get(self, index):
+        return self.text
+
+class _Sequence:
+    """Concatenation; the last part varies fastest, like itertools.product."""
+    def __init__(self, parts):
+        self.parts = parts
+        self.count = 1
+        for p in parts: self.count *= p.count
+
+    def get(self, index):
+        out = []
+        for part in reversed(self.parts):
+            index, sub = divmod(index, part.count)
+            out.append(part.get(sub))
+        return "".join(reversed(out))
+
+class _Choice:
+    """One of several options (weights don't matter when enumerating)."""
+    def __init__(self, options):
+        self.options = [o for o in options if o.count]
+        self.offsets = list(accumulate(o.count for o in self.options))
+        self.count = self.offsets[-1] if self.offsets else 0
+
+    def get(self, index):
+        i = bisect_right(self.offsets, index)
+        return self.options[i].get(index - (self.offsets[i - 1] if i else 0))
+
+def _multichoose(n, k):
+    """Multisets of size k drawn from n values."""
+    if k == 0: return 1
+    return comb(n + k - 1, k) if n else 0
+
+def _unrank_multiset(index, n, k):
+    """Multiset #index of size k from range(n), as a non-decreasing list."""
+    picked, low = [], 0
+    for remaining in range(k, 0, -1):
+        for value in range(low, n):
+            block = _multichoose(n - value, remaining - 1)
+            if index < block: break
+            index -= block
+        picked.append(value)
+        low = value
+    return picked
+
+class _MultiSelect:
+    """
+    `{N$$sep$$a|b|c}`: every subset of each allowed size, options kept in their written order.
+    An option written several times (like `3#__colors__`, which is `__colors__` three times) is
+    one option that can be picked up to that many times, each pick a value of it with repetition,
+    so every distinct output is counted once.
+    ways[i][k] is the number of expansions that pick k options from options[i:].
+    """
+    def __init__(self, options, repeats, sizes, sep):
+        self.options, self.repeats, self.sizes, self.sep = options, repeats, sizes, sep
+        n, top = len(options), max(sizes, default=0)
+        self.ways = [[0] * (top + 1) for _ in range(n + 1)]
+        self.ways[n][0] = 1
+        for i in range(n - 1, -1, -1):
+            m = options[i].count
+            for k in range(top + 1):
+                self.ways[i][k] = sum(_multichoose(m, j) * self.ways[i + 1][k - j] for j in range(min(repeats[i], k) + 1))
+        self.offsets = list(accumulate(self.ways[0][k] for k in sizes))
+        self.count = self.offsets[-1] if self.offsets else 0
+
+    def get(self, index):
+        block = bisect_right(self.offsets, index)
+        index -= self.offsets[block - 1] if block else 0
+        need, picked = self.sizes[block], []
+        for i, option in enumerate(self.options):
+            if need == 0: break
+            for j in range(min(self.repeats[i], need), -1, -1):
+                rest = self.ways[i + 1][need - j]
+                take = _multichoose(option.count, j) * rest
+                if index < take:
+                    sub, index = divmod(index, rest)
+                    picked.extend(option.get(v) for v in _unrank_multiset(sub, option.count, j))
+                    need -= j
+                    break
+                index -= take
+        return self.sep.join(picked)
+
+class TemplateEnumerator:
+    """
+    Enumerates every expansion of a Wildcard Manager template: the Cartesian product of its
+    `{}` groups and `__wildcards__`, in a stable order.
+    `count` is computed without building any output, `get(k)` returns combination #k directly,
+    so an enumeration can be split across workers by index range.
+    `*`/`+` prefixes and weights are ignored; multi-selects give each subset once, in written order,
+    and repeated options (`N#__wildcard__`) as picks with repetition.
+    """
+    def __init__(self, manager, template, max_depth=None):
+        from .wildcard import WildcardManager
+        self.manager = manager
+        self.max_depth = max_depth or WildcardManager.DEFAULT_LIMITS[0]
+        self._wildcards = {}
+        self.root = self._parse(_expand_quantifiers(template), [])
+        self.count = self.root.count
+
+    def __len__(self):
+        return self.count
+
+    def get(self, index):
+        if index < 0: index += self.count
+        if not 0 <= index < self.count: raise IndexError(f"Combination #{index} is out of range (0-{self.count - 1})")
+        return self.root.get(index)
+
+    def iter(self, start=0, stop=None):
+        """Lazily yields combinations start..stop-1."""
+        stop = self.count if stop is None else min(stop, self.count)
+        for index in range(max(0, start), stop):
+            yield self.root.get(index)
+
+    def shard(self, shard_index, shard_count):
+        """Contiguous index range for worker `shard_index` of `shard_count`."""
+        size = -(-self.count // shard_count)
+        return range(min(self.count, shard_index * size), min(self.count, (shard_index + 1) * size))
+
+    def _parse(self, text, stack):
+        from .wildcard import WildcardExpansionError
+        if len(stack) >= self.max_depth:
+            raise WildcardExpansionError("depth", f"Nesting is deeper than {self.max_depth} levels", stack, self.max_depth)
+        parts, literal, i, strip_next = [], [], 0, False
+        def flush():
+            if literal:
+                parts.append(_Literal("".join(literal)))
+                literal.clear()
+        while i < len(text):
+            if strip_next:
+                while i < len(text) and text[i].isspace(): i += 1
+                strip_next = False
+                continue
+            if text[i] == '{':
+                end = _matching_brace(text, i)
+                content = text[i + 1:end] if end != -1 else ""
+                if content:
+                    flush()
+                    parts.append(self._parse_group(content, stack))
+                    i = end + 1
+                    continue
+            elif text.startswith('__', i):
+                match = WILDCARD_PATTERN.match(text, i)
+                if match:
+                    flush()
+                    node = self._wildcard(match.group(2), stack)
+                    if node is None: strip_next = True
+                    else: parts.append(node)
+                    i = match.end()
+                    continue
+            literal.append(text[i])
+            i += 1
+        flush()
+        if len(parts) == 1: return parts[0]
+        return _Sequence(parts) if parts else _Literal("")
+
+    def _parse_group(self, content, stack):
+        if content[0] in '*+': content = content[1:]
+        sections = _split_top_level(content, '$$')
+        if len(sections) > 1:
+            if len(sections) == 3: range_str, sep, opt_str = sections
+            else: range_str, sep, opt_str = sections[0], ", ", sections[1]
+            written = _split_top_level(opt_str, '|')
+            # Repeated options (e.g. from N#__wildcard__) are grouped, in order of first appearance.
+            repeats = {}
+            for o in written: repeats[o] = repeats.get(o, 0) + 1
+            options = [self._parse(o, stack + ["{" + o[:40] + "}"]) for o in repeats]
+            return _MultiSelect(options, list(repeats.values()), self._sizes(range_str, len(written)), sep)
+        options = {}
+        for opt in _split_top_level(content, '|'):
+            weight = _split_top_level(opt, '::')
+            if len(weight) > 1:
+                try:
+                    float(weight[0])
+                    opt = "::".join(weight[1:])
+                except ValueError: pass
+            # An option written twice only changes its odds, not the outputs.
+            if opt not in options: options[opt] = self._parse(opt, stack + ["{" + opt[:40] + "}"])
+        return _Choice(list(options.values()))
+
+    @staticmethod
+    def _sizes(range_str, opt_count):
+        try:
+            if not range_str: sizes = [1]
+            elif '-' in range_str:
+                low, high = range_str.split('-')[:2]
+                sizes = list(range(int(low) if low else 1, (int(high) if high else opt_count) + 1))
+            else: sizes = [int(range_str)]
+        except ValueError: sizes = [1]
+        return sorted({max(0, min(k, opt_count)) for k in sizes})
+
+    def _wildcard(self, name, stack):
+        from .wildcard import WildcardExpansionError
+        label = f"__{name}__"
+        if label in stack:
+            raise WildcardExpansionError("cycle", f"Wildcard {label} references itself", stack + [label])
+        if name not in self._wildcards:
+            options = self.manager._get_wildcard_options(name)
+            self._wildcards[name] = _Choice([self._parse(_expand_quantifiers(o), stack + [label]) for o in options]) if options else None
+        return self._wildcards[name]
@@ -0,0 +1,143 @@
+import os
+import re
+import sys
+import threading
+from array import array
+from .wildcard_store import WildcardCatalog, YamlWildcardIndex, LineWindowIndex, wildcard_name_from_path
+from .wildcard_stats import STATS
+
+# Words are split on "_" too, so "hair" finds "long_hair".
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+def _tokens(text):
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+def _is_yaml(file_path):
+    return file_path.lower().endswith(('.yaml', '.yml'))
+
+def _yaml_entries(file_path):
+    """(key path, item number, text) of every YAML list item, in the order entries are numbered."""
+    return [(key, n + 1, str(value)) for key, values in sorted(YamlWildcardIndex.get_index(file_path).items())
+            for n, value in enumerate(values)]
+
+class WildcardSearchIndex:
+    """
+    Inverted index (file -> word -> entry numbers) over the lines of every .txt wildcard and
+    every YAML list leaf of a wildcards folder. Only the numbers are kept: a .txt entry is its
+    line number, read back through LineWindowIndex when it is returned, a YAML entry is the
+    item's position in the file's (already cached) YAML index.
+    Built on the first search; after that files are (re)indexed one at a time: whatever changed
+    since the last sync according to the catalog, or a single file pushed by the save/delete
+    routes through `update_file`.
+    """
+    _indexes = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, root):
+        self.catalog = WildcardCatalog.for_root(root)
+        self.root = self.catalog.root
+        self._files = {}      # path -> (stamp, {token: array of entry numbers})
+        self._version = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def for_root(cls, root):
+        root = os.path.abspath(root)
+        index = cls._indexes.get(root)
+        if index is None:
+            with cls._indexes_lock:
+                index = cls._indexes.get(root)
+                if index is None: index = cls._indexes[root] = cls(root)
+        return index
+
+    @staticmethod
+    def _iter_entries(file_path):
+        """(entry number, text) pairs; .txt entries are numbered by line like LineWindowIndex."""
+        if _is_yaml(file_path):
+            for i, (_, _, text) in enumerate(_yaml_entries(file_path)): yield i, text
+            return
+        with open(file_path, 'rb') as f:
+            for n, raw in enumerate(f, 1):
+                line = raw.decode('utf-8', errors='replace').strip()
+                if line and not line.startswith('#'): yield n, line
+
+    def _index(self, file_path, stamp):
+        self._files.pop(file_path, None)
+        postings = {}
+        try:
+            for i, text in self._iter_entries(file_path):
+                for token in _tokens(text):
+                    entries = postings.get(token)
+                    if entries is None: postings[sys.intern(token)] = array('I', (i,))
+                    else: entries.append(i)
+        except OSError: return
+        self._files[file_path] = (stamp, postings)
+        STATS.count("search_index_files")
+
+    def sync(self):
+        """Indexes new or changed files and forgets deleted ones; a no-op while the catalog is unchanged."""
+        if self._version == self.catalog.version: return
+        with self._lock, STATS.timer("search_index_sync"):
+            version = self.catalog.version
+            current = {path: (mtime, size) for path, mtime, size in self.catalog.files().values()}
+            for path in set(self._files) - set(current): del self._files[path]
+            for path, stamp in current.items():
+                cached = self._files.get(path)
+                if not cached or cached[0] != stamp: self._index(path, stamp)
+            self._version = version
+
+    def update_file(self, file_path):
+        """Re-indexes (or drops) one file right after it was saved or deleted; ignored until the first search."""
+        if self._version is None: return
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            try:
+                st = os.stat(file_path)
+                self._index(file_path, (st.st_mtime_ns, st.st_size))
+            except OSError:
+                self._files.pop(file_path, None)
+
+    @staticmethod
+    def _read_results(file_path, numbers, words):
+        """(key, line, text) of the given entries, skipping any that changed since they were indexed."""
+        if _is_yaml(file_path):
+            entries = _yaml_entries(file_path)
+            found = [entries[i] for i in numbers if i < len(entries)]
+        else:
+            st = os.stat(file_path)
+            offsets = LineWindowIndex.get_offsets(file_path, (st.st_mtime_ns, st.st_size))
+            found = []
+            with open(file_path, 'rb') as f:
+                for n in numbers:
+                    if n >= len(offsets): continue
+                    f.seek(offsets[n - 1])
+                    found.append((None, n, f.read(offsets[n] - offsets[n - 1]).decode('utf-8', errors='replace').strip()))
+        return [entry for entry in found if words <= _tokens(entry[2])]
+
+    def search(self, query, limit=100):
+        """
+        Entries containing every word of `query` (case-insensitive, whole words), in catalog order.
+        Returns (total matches, [{"file", "key", "line", "text"}, ...] up to `limit`).
+        """
+        words = _tokens(query)
+        if not words: return 0, []
+        self.sync()
+        with self._lock, STATS.timer("search_query"):
+            hits = {}
+            for path, (_, postings) in self._files.items():
+                # Intersect starting from the rarest word.
+                lists = sorted((postings.get(w, ()) for w in words), key=len)
+                if not lists[0]: continue
+                common = set(lists[0])
+                for other in lists[1:]:
+                    common.intersection_update(other)
+                    if not common: break
+                if common: hits[path] = sorted(common)
+            total, results = sum(len(e) for e in hits.values()), []
+            for path in sorted(hits, key=lambda p: wildcard_name_from_path(self.root, p).lower()):
+                if len(results) >= limit: break
+                name = wildcard_name_from_path(self.root, path)
+                try: found = self._read_results(path, hits[path][:limit - len(results)], words)
+                except OSError: continue
+                results.extend({"file": name, "key": key, "line": line, "text": text} for key, line, text in found)
+            return total, results
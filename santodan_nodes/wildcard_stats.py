@@ -0,0 +1,73 @@
+import time
+import threading
+from contextlib import contextmanager
+
+class ExpansionStats:
+    """
+    Process-wide counters for the wildcard engine: total expansion time, per-wildcard lookup
+    times, file reads and cache hit rates. Served by GET /santodan/wildcard-stats.
+    Parallel workers run in their own processes, so their lookups are not included.
+    """
+    # (hits, misses...) counter groups reported as hit rates in the snapshot.
+    CACHE_GROUPS = {
+        "yaml_index": ("yaml_memory_hits", ("yaml_sidecar_loads", "yaml_parses")),
+        "txt": ("txt_memory_hits", ("txt_reads", "txt_index_builds")),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.counters = {}
+            self.timers = {}
+            self.wildcards = {}
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            calls, total = self.timers.get(name, (0, 0.0))
+            self.timers[name] = (calls + 1, total + seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try: yield
+        finally: self.add_time(name, time.perf_counter() - start)
+
+    def record_wildcard(self, name, seconds, option_count):
+        with self._lock:
+            lookups, total, _ = self.wildcards.get(name, (0, 0.0, 0))
+            self.wildcards[name] = (lookups + 1, total + seconds, option_count)
+
+    def snapshot(self, top=50):
+        """JSON-ready view; `top` limits the per-wildcard list to the slowest entries."""
+        with self._lock:
+            counters, timers, wildcards = dict(self.counters), dict(self.timers), dict(self.wildcards)
+        cache = {}
+        for group, (hit_key, miss_keys) in self.CACHE_GROUPS.items():
+            hits = counters.get(hit_key, 0)
+            total = hits + sum(counters.get(k, 0) for k in miss_keys)
+            cache[group] = {"hits": hits, "lookups": total, "hit_rate": round(hits / total, 4) if total else None}
+        expand_seconds = timers.get("expand", (0, 0.0))[1]
+        lookup_seconds = timers.get("wildcard_lookup", (0, 0.0))[1]
+        slowest = sorted(wildcards.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+        return {
+            "since": self.started,
+            "counters": counters,
+            "timers": {k: {"calls": c, "seconds": round(t, 6)} for k, (c, t) in timers.items()},
+            "cache": cache,
+            # Time inside _process_syntax that was not spent fetching wildcard options (regex scanning, RNG, joins).
+            "syntax_seconds": round(max(0.0, expand_seconds - lookup_seconds), 6),
+            "wildcards": [
+                {"name": k, "lookups": n, "seconds": round(t, 6), "avg_ms": round(t / n * 1000, 4), "options": o}
+                for k, (n, t, o) in slowest
+            ],
+        }
+
+STATS = ExpansionStats()
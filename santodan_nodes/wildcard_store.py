@@ -0,0 +1,502 @@
+import os
+import re
+import mmap
+import pickle
+import hashlib
+import threading
+import time
+import yaml
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from collections.abc import Sequence
+from .wildcard_stats import STATS
+from .cursor_store import data_dir
+
+# Bump when the pickled layout changes so stale sidecars are rebuilt.
+INDEX_FORMAT = 1
+
+def _flatten_yaml(node, prefix, index):
+    """Walks a YAML document collecting every list leaf under its '/'-joined key path."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            _flatten_yaml(value, f"{prefix}/{key}" if prefix else str(key), index)
+    elif isinstance(node, list):
+        index[prefix] = [str(x) for x in node]
+
+def _compile_key_glob(pattern, match_children=True):
+    """
+    '*' matches inside one key, '**' matches any number of nested keys.
+    With `match_children` a match also covers every key below it.
+    """
+    regex = ""
+    for token in re.split(r'(\*\*|\*|\?)', pattern):
+        if token == "**": regex += ".*"
+        elif token == "*": regex += "[^/]*"
+        elif token == "?": regex += "[^/]"
+        else: regex += re.escape(token)
+    return re.compile(regex + (r"(/.*)?\Z" if match_children else r"\Z"))
+
+class YamlWildcardIndex:
+    """
+    Flat `key/path -> options` map for every YAML wildcard file.
+    Each file is parsed once, kept in memory and persisted as a pickle sidecar in
+    `<data_dir>/cache/yaml_index` (so a restart doesn't re-parse big YAML packs),
+    both are invalidated by the file's mtime and size.
+    """
+    _indexes = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _sidecar_path(file_path):
+        digest = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+        return data_dir("cache", "yaml_index", f"{digest}.pickle")
+
+    @classmethod
+    def _load_sidecar(cls, file_path, stamp):
+        try:
+            with open(cls._sidecar_path(file_path), 'rb') as f:
+                data = pickle.load(f)
+            if data.get("format") == INDEX_FORMAT and data.get("stamp") == stamp: return data["index"]
+        except Exception: pass
+        return None
+
+    @classmethod
+    def _save_sidecar(cls, file_path, stamp, index):
+        try:
+            sidecar = cls._sidecar_path(file_path)
+            os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+            tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({"format": INDEX_FORMAT, "stamp": stamp, "index": index}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, sidecar)
+        except Exception as e:
+            print(f"[Santodan Wildcard Manager] Could not write YAML index for {file_path}: {e}")
+
+    @classmethod
+    def get_index(cls, file_path):
+        """Returns the flat index for a YAML file, building it only when the file changed."""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return {}
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = cls._indexes.get(file_path)
+        if cached and cached[0] == stamp:
+            STATS.count("yaml_memory_hits")
+            return cached[1]
+        with cls._lock:
+            cached = cls._indexes.get(file_path)
+            if cached and cached[0] == stamp:
+                STATS.count("yaml_memory_hits")
+                return cached[1]
+            index = cls._load_sidecar(file_path, stamp)
+            if index is not None: STATS.count("yaml_sidecar_loads")
+            else:
+                STATS.count("yaml_parses")
+                index = {}
+                try:
+                    with STATS.timer("yaml_parse"), open(file_path, 'r', encoding='utf-8') as f:
+                        _flatten_yaml(yaml.safe_load(f), "", index)
+                except Exception as e:
+                    print(f"[Santodan Wildcard Manager] Could not parse YAML wildcard {file_path}: {e}")
+                cls._save_sidecar(file_path, stamp, index)
+            cls._indexes[file_path] = (stamp, index)
+            return index
+
+    @classmethod
+    def get_options(cls, file_path, key_path):
+        """
+        Options for `key_path` inside the file. Key globs (`*`, `**`, `?`) return the options
+        of every matching list, including lists nested below a matching key.
+        """
+        index = cls.get_index(file_path)
+        if not any(c in key_path for c in "*?"): return index.get(key_path, [])
+        matcher = _compile_key_glob(key_path)
+        options = []
+        for path in sorted(index):
+            if matcher.match(path): options.extend(index[path])
+        return options
+
+    @classmethod
+    def get_key_paths(cls, file_path):
+        return sorted(cls.get_index(file_path))
+
+    @classmethod
+    def invalidate(cls, file_path=None):
+        """Drops in-memory indexes (sidecars are re-validated against the file on next use)."""
+        with cls._lock:
+            if file_path is None: cls._indexes.clear()
+            else: cls._indexes.pop(file_path, None)
+
+# .txt wildcards bigger than this are served from a line-offset index over a memory map
+# instead of a list of Python strings.
+LARGE_FILE_BYTES = 1024 * 1024
+
+class LineIndexedFile(Sequence):
+    """
+    Read-only sequence of the usable lines (stripped, no blanks or `#` comments) of a text file.
+    Only the byte offsets are kept (16 bytes per line), a line is decoded when it is picked.
+    On Windows the file is re-opened per read instead of staying mapped, so it can still be
+    saved or deleted while indexed.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._offsets = array('Q')
+        self._mm = None
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0: return
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        pos, size = 0, len(mm)
+        while pos < size:
+            end = mm.find(b'\n', pos)
+            if end == -1: end = size
+            line = mm[pos:end].decode('utf-8', errors='replace').strip()
+            if line and not line.startswith('#'): self._offsets.extend((pos, end))
+            pos = end + 1
+        if os.name == 'nt': mm.close()
+        else: self._mm = mm
+
+    def __len__(self):
+        return len(self._offsets) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self): raise IndexError(index)
+        start, end = self._offsets[2 * index], self._offsets[2 * index + 1]
+        if self._mm is not None: raw = self._mm[start:end]
+        else:
+            with open(self.path, 'rb') as f:
+                f.seek(start)
+                raw = f.read(end - start)
+        return raw.decode('utf-8', errors='replace').strip()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+class TextWildcardIndex:
+    """
+    Options of every .txt wildcard, read once and revalidated by mtime and size on each lookup.
+    Small files are kept as lists, files over LARGE_FILE_BYTES as a LineIndexedFile.
+    """
+    _files = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_options(cls, file_path):
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return []
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = cls._files.get(file_path)
+        if cached and cached[0] == stamp:
+            STATS.count("txt_memory_hits")
+            return cached[1]
+        with cls._lock:
+            cached = cls._files.get(file_path)
+            if cached and cached[0] == stamp:
+                STATS.count("txt_memory_hits")
+                return cached[1]
+            if cached: cls._close(cached[1])
+            try:
+                if st.st_size > LARGE_FILE_BYTES:
+                    STATS.count("txt_index_builds")
+                    with STATS.timer("txt_index_build"): options = LineIndexedFile(file_path)
+                else:
+                    STATS.count("txt_reads")
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        options = [line for line in (l.strip() for l in f) if line and not line.startswith('#')]
+            except OSError:
+                cls._files.pop(file_path, None)
+                return []
+            cls._files[file_path] = (stamp, options)
+            return options
+
+    @staticmethod
+    def _close(options):
+        if isinstance(options, LineIndexedFile): options.close()
+
+    @classmethod
+    def invalidate(cls, file_path=None):
+        """Forgets (and unmaps) one file or all of them, e.g. right before a file is overwritten."""
+        with cls._lock:
+            paths = list(cls._files) if file_path is None else [file_path]
+            for path in paths:
+                cached = cls._files.pop(path, None)
+                if cached: cls._close(cached[1])
+
+class LineWindowIndex:
+    """
+    Start offset of every raw line of a wildcard file (blanks and comments included), so the
+    editor routes can return a window of lines without reading the whole file.
+    Revalidated by mtime and size like the option indexes.
+    """
+    _files = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_offsets(cls, file_path, stamp):
+        cached = cls._files.get(file_path)
+        if cached and cached[0] == stamp: return cached[1]
+        with cls._lock:
+            cached = cls._files.get(file_path)
+            if cached and cached[0] == stamp: return cached[1]
+            offsets, pos = array('Q', [0]), 0
+            with open(file_path, 'rb') as f:
+                for line in f:
+                    pos += len(line)
+                    offsets.append(pos)
+            # A trailing newline doesn't start another line.
+            if len(offsets) > 1 and offsets[-1] == offsets[-2]: offsets.pop()
+            cls._files[file_path] = (stamp, offsets)
+            return offsets
+
+    @classmethod
+    def read_window(cls, file_path, start, count=None):
+        """Returns (text of lines start..start+count-1, total line count)."""
+        st = os.stat(file_path)
+        offsets = cls.get_offsets(file_path, (st.st_mtime_ns, st.st_size))
+        total = len(offsets) - 1
+        start = max(0, min(start, total))
+        stop = total if count is None else max(start, min(total, start + count))
+        with open(file_path, 'rb') as f:
+            f.seek(offsets[start])
+            raw = f.read(offsets[stop] - offsets[start])
+        return raw.decode('utf-8', errors='replace'), total
+
+    @classmethod
+    def invalidate(cls, file_path=None):
+        with cls._lock:
+            if file_path is None: cls._files.clear()
+            else: cls._files.pop(file_path, None)
+
+def count_wildcard_lines(file_path):
+    """Number of non-blank, non-comment lines, without keeping the file around."""
+    st = os.stat(file_path)
+    cached = TextWildcardIndex._files.get(file_path)
+    if cached and cached[0] == (st.st_mtime_ns, st.st_size): return len(cached[1])
+    with open(file_path, 'rb') as f:
+        return sum(1 for line in f if line.strip() and not line.lstrip().startswith(b'#'))
+
+class GlobOptions(Sequence):
+    """
+    The lines of several .txt wildcards seen as one list (so picking an index weights files by
+    line count). Only the file that holds a picked line is read.
+    """
+    def __init__(self, paths, counts):
+        self.paths, self.counts = paths, counts
+        self.offsets = list(accumulate(counts))
+
+    def __len__(self):
+        return self.offsets[-1] if self.offsets else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self): raise IndexError(index)
+        f = bisect_right(self.offsets, index)
+        options = TextWildcardIndex.get_options(self.paths[f])
+        if not options: return ""
+        # A file edited since it was counted may be shorter now.
+        return options[(index - (self.offsets[f - 1] if f else 0)) % len(options)]
+
+    def choice_by_file(self, rng):
+        """Picks a file uniformly, then a line from it."""
+        paths = [p for p, c in zip(self.paths, self.counts) if c]
+        if not paths: return ""
+        options = TextWildcardIndex.get_options(rng.choice(paths))
+        return rng.choice(options) if options else ""
+
+WILDCARD_EXTENSIONS = ('.txt', '.yaml', '.yml')
+
+def wildcard_name_from_path(root, file_path):
+    """'<root>/sub/name.txt' -> 'sub/name', YAML files keep their extension."""
+    name = os.path.relpath(file_path, root).replace('\\', '/')
+    return name[:-4] if name.lower().endswith('.txt') else name
+
+class WildcardCatalog:
+    """
+    Shared, incrementally maintained listing of a wildcards folder, used by the node dropdown,
+    the `all_wildcards` output and the API routes.
+    A background thread polls directory mtimes every POLL_INTERVAL seconds and only rescans the
+    folders that changed; the save/delete routes push their changes through `update_file`.
+    `version` increases on every change so callers can cache derived data against it.
+    """
+    POLL_INTERVAL = 5.0
+    _catalogs = {}
+    _catalogs_lock = threading.Lock()
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.version = 0
+        self._dirs = {}
+        self._files = {}
+        self._names = None
+        self._lower_names = None
+        self._globs = {}
+        self._line_counts = {}
+        self._lock = threading.RLock()
+        with self._lock:
+            self._scan_dir(self.root)
+
+    @classmethod
+    def for_root(cls, root):
+        """Returns the catalog for `root`, creating it and its poller on first use."""
+        root = os.path.abspath(root)
+        catalog = cls._catalogs.get(root)
+        if catalog is None:
+            with cls._catalogs_lock:
+                catalog = cls._catalogs.get(root)
+                if catalog is None:
+                    catalog = cls._catalogs[root] = cls(root)
+                    threading.Thread(target=catalog._poll_forever, name="santodan-wildcard-catalog", daemon=True).start()
+        return catalog
+
+    def _poll_forever(self):
+        while True:
+            try:
+                time.sleep(self.POLL_INTERVAL)
+                self.refresh()
+            except Exception as e: print(f"[Santodan Wildcard Manager] Wildcard catalog refresh failed: {e}")
+
+    def _changed(self):
+        self.version += 1
+        self._names = None
+        self._lower_names = None
+        self._globs = {}
+
+    def _scan_dir(self, dir_path):
+        """Re-lists one directory, recursing only into sub-directories that are new."""
+        try:
+            mtime = os.stat(dir_path).st_mtime_ns
+            entries = list(os.scandir(dir_path))
+        except OSError:
+            self._drop_dir(dir_path)
+            return
+        _, old_files, old_dirs = self._dirs.get(dir_path, (None, set(), set()))
+        files, dirs = set(), set()
+        self._dirs[dir_path] = (mtime, files, dirs)
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                dirs.add(entry.path)
+                if entry.path not in self._dirs: self._scan_dir(entry.path)
+            elif entry.name.lower().endswith(WILDCARD_EXTENSIONS):
+                files.add(entry.path)
+                self._set_file(entry.path, entry.stat())
+        for path in old_files - files:
+            self._drop_file(path)
+        for path in old_dirs - dirs:
+            self._drop_dir(path)
+
+    def _drop_dir(self, dir_path):
+        _, files, dirs = self._dirs.pop(dir_path, (None, set(), set()))
+        for path in files: self._drop_file(path)
+        for path in dirs: self._drop_dir(path)
+
+    def _drop_file(self, file_path):
+        self._line_counts.pop(file_path, None)
+        if self._files.pop(file_path, None) is not None: self._changed()
+
+    def _set_file(self, file_path, st):
+        stamp = (st.st_mtime_ns, st.st_size)
+        if self._files.get(file_path) != stamp:
+            self._files[file_path] = stamp
+            self._changed()
+
+    def refresh(self):
+        """One polling step: rescan changed folders and pick up edits to known files."""
+        with self._lock:
+            if self.root not in self._dirs: self._scan_dir(self.root)
+            for dir_path in list(self._dirs):
+                if dir_path not in self._dirs: continue
+                try: changed = os.stat(dir_path).st_mtime_ns != self._dirs[dir_path][0]
+                except OSError: changed = True
+                if changed: self._scan_dir(dir_path)
+            for file_path in list(self._files):
+                try: self._set_file(file_path, os.stat(file_path))
+                except OSError: self._drop_file(file_path)
+
+    def update_file(self, file_path):
+        """Records a file that was just written or deleted, and any folder created for it."""
+        file_path = os.path.abspath(file_path)
+        parent = os.path.dirname(file_path)
+        with self._lock:
+            if parent not in self._dirs:
+                # Rescan from the closest known ancestor so new folders get picked up.
+                top = parent
+                while top not in self._dirs and os.path.dirname(top) != top: top = os.path.dirname(top)
+                if top in self._dirs: self._scan_dir(top)
+                return
+            mtime, files, dirs = self._dirs[parent]
+            try:
+                st = os.stat(file_path)
+                if file_path.lower().endswith(WILDCARD_EXTENSIONS):
+                    files.add(file_path)
+                    self._set_file(file_path, st)
+            except OSError:
+                files.discard(file_path)
+                self._drop_file(file_path)
+            try: self._dirs[parent] = (os.stat(parent).st_mtime_ns, files, dirs)
+            except OSError: pass
+
+    def names(self):
+        """Sorted wildcard names (case-insensitive), as used by the dropdown and the API."""
+        with self._lock:
+            if self._names is None:
+                self._names = sorted((wildcard_name_from_path(self.root, p) for p in self._files), key=str.lower)
+            return self._names
+
+    def search(self, query="", match="substring", offset=0, limit=None):
+        """
+        Case-insensitive name search over the catalog, in names() order.
+        `match` is "prefix" (binary search on the sorted names) or "substring".
+        Returns (total matches, names[offset:offset + limit]).
+        """
+        with self._lock:
+            names = self.names()
+            if self._lower_names is None: self._lower_names = [n.lower() for n in names]
+            lower = self._lower_names
+        query = query.lower()
+        if not query: matches = names
+        elif match == "prefix":
+            # Sorted by str.lower, so every match sits in one contiguous block.
+            start = bisect_left(lower, query)
+            stop = bisect_left(lower, query + "\U0010ffff", start)
+            matches = names[start:stop]
+        else:
+            matches = [n for n, l in zip(names, lower) if query in l]
+        offset = max(0, offset)
+        return len(matches), matches[offset:None if limit is None else offset + limit]
+
+    def line_count(self, file_path):
+        """Usable lines of a .txt wildcard, counted once per file version when a glob first needs it."""
+        stamp = self._files.get(file_path)
+        cached = self._line_counts.get(file_path)
+        if cached and cached[0] == stamp: return cached[1]
+        try: count = count_wildcard_lines(file_path)
+        except OSError: count = 0
+        self._line_counts[file_path] = (stamp, count)
+        return count
+
+    def glob_options(self, pattern):
+        """
+        GlobOptions over every .txt wildcard whose name matches `pattern` ('*' one level, '**' any depth).
+        Only the matched files are counted, once per file version.
+        """
+        with self._lock:
+            cached = self._globs.get(pattern)
+            if cached is None:
+                matcher = _compile_key_glob(pattern, match_children=False)
+                paths = [os.path.join(self.root, *name.split('/')) + ".txt" for name in self.names()
+                         if not name.lower().endswith(('.yaml', '.yml')) and matcher.match(name)]
+                cached = self._globs[pattern] = GlobOptions(paths, [self.line_count(p) for p in paths])
+            return cached
+
+    def files(self):
+        """{wildcard name: (full path, mtime_ns, size)} snapshot."""
+        with self._lock:
+            return {wildcard_name_from_path(self.root, p): (p, *stamp) for p, stamp in self._files.items()}
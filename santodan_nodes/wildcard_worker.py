@@ -0,0 +1,100 @@
+"""
+Worker processes for the Wildcard Manager's `parallel_workers` option.
+
+Each worker is a fresh interpreter started with `sys.executable`, not a fork or a multiprocessing
+spawn of the ComfyUI server: it inherits no threads or held locks (catalog poller, indexes, stats)
+and never imports ComfyUI, its main script or this custom node under ComfyUI's module name.
+It only puts the custom node folder on sys.path and imports `santodan_nodes.wildcard`.
+Jobs and results are pickles of plain values over the worker's stdin/stdout.
+"""
+import os
+import sys
+import pickle
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait
+from .cursor_store import data_dir
+
+# Folder holding `santodan_nodes`, put on the worker's sys.path.
+NODE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_BOOTSTRAP = "import sys; sys.path.insert(0, sys.argv[1]); from santodan_nodes.wildcard_worker import serve; sys.exit(serve())"
+
+class WorkerError(Exception):
+    """A line failed in a worker; `details` is WildcardExpansionError.to_dict() or {"kind": None, "message": ...}."""
+    def __init__(self, details):
+        super().__init__(details["message"])
+        self.details = details
+
+class ExpansionPool:
+    """
+    `workers` worker processes, each expanding one shard of (line_number, line) pairs per job.
+    The processes start on the first job. A pool that timed out or lost a worker is closed and
+    `alive` turns False.
+    """
+    def __init__(self, workers):
+        self.workers = workers
+        self._procs = []
+        self._io = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="santodan-wildcard-pool")
+        self.alive = True
+
+    @staticmethod
+    def _exchange(proc, job):
+        pickle.dump(job, proc.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+        proc.stdin.flush()
+        return pickle.load(proc.stdout)
+
+    def map(self, shards, seed, settings, timeout):
+        """
+        Returns [(expanded lines, `+` cursors used)] in shard order. Raises TimeoutError when the
+        workers take longer than `timeout` seconds, WorkerError when a line fails, and any
+        I/O or unpickling error when a worker died.
+        """
+        if len(shards) > self.workers: raise ValueError("More shards than worker processes")
+        if not self.alive: raise RuntimeError("worker pool is closed")
+        if not self._procs:
+            # Workers can't ask ComfyUI for the user directory, so they get the data folder passed in.
+            env = dict(os.environ, SANTODAN_DATA_DIR=data_dir())
+            self._procs = [subprocess.Popen([sys.executable, "-c", _BOOTSTRAP, NODE_ROOT], env=env,
+                                            stdin=subprocess.PIPE, stdout=subprocess.PIPE) for _ in range(self.workers)]
+        futures = [self._io.submit(self._exchange, proc, (shard, seed, settings)) for proc, shard in zip(self._procs, shards)]
+        done, pending = wait(futures, timeout=timeout)
+        if pending:
+            # A killed worker also ends the read still blocked in its I/O thread.
+            self.close(kill=True)
+            raise TimeoutError(f"worker processes didn't answer within {timeout}s")
+        results = []
+        for future in futures:
+            status, payload = future.result()
+            if status != "ok": raise WorkerError(payload)
+            results.append(payload)
+        return results
+
+    def close(self, kill=False):
+        """Closes the workers' stdin so they exit; `kill` (or a worker that doesn't exit) stops them right away."""
+        self.alive = False
+        for proc in self._procs:
+            if kill: proc.kill()
+            try: proc.stdin.close()
+            except OSError: pass
+        for proc in self._procs:
+            try: proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+        self._io.shutdown(wait=False)
+
+def serve():
+    """Worker loop: (shard, seed, settings) in, ("ok", (texts, cursors used)) or ("error", details) out, until stdin closes."""
+    out = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    # Anything printed while expanding goes to stderr, stdout only carries results.
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    from .wildcard import expand_shard, WildcardExpansionError
+    stdin = sys.stdin.buffer
+    while True:
+        try: shard, seed, settings = pickle.load(stdin)
+        except EOFError: return 0
+        try: reply = ("ok", expand_shard(shard, seed, settings))
+        except WildcardExpansionError as e: reply = ("error", e.to_dict())
+        except Exception as e: reply = ("error", {"kind": None, "message": f"{type(e).__name__}: {e}"})
+        pickle.dump(reply, out, protocol=pickle.HIGHEST_PROTOCOL)
+        out.flush()